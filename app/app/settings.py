@@ -37,15 +37,18 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
     'rest_framework',
     'rest_framework.authtoken',
     'drf_spectacular',
     'user',
     'recipe',
+    'job',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,6 +56,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.db.middleware.ReplicaPinningMiddleware',
 ]
 
 ROOT_URLCONF = 'app.urls'
@@ -79,17 +83,113 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+TRIGRAM_SIMILARITY_THRESHOLD = float(
+    os.environ.get('TRIGRAM_SIMILARITY_THRESHOLD', 0.5)
+)
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'core.db.postgresql',
         'HOST': os.environ.get('DB_HOST'),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASSWORD'),
+        'OPTIONS': {
+            # Minimum trigram similarity of autocomplete suggestions. The
+            # pg_trgm default of 0.3 rechecks too many rows on short queries.
+            'options': '-c pg_trgm.similarity_threshold='
+                       f'{TRIGRAM_SIMILARITY_THRESHOLD}',
+            # Connections per process, shared by its request threads.
+            'pool': {
+                'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 0)),
+                'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+                'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 5)),
+                'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+                'max_lifetime': float(
+                    os.environ.get('DB_POOL_MAX_LIFETIME', 3600)
+                ),
+            },
+        },
+    }
+}
 
+
+# Threads running the queries of async views, one per pooled connection.
+ASYNC_DB_THREADS = int(os.environ.get(
+    'ASYNC_DB_THREADS',
+    DATABASES['default']['OPTIONS']['pool']['max_size'],
+))
+
+# Read replicas, as comma separated HOST or HOST:PORT entries. Replicas
+# use the primary's credentials and database name.
+
+REPLICA_DATABASES = []
+for index, replica in enumerate(
+    filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(','))
+):
+    host, _, port = replica.strip().partition(':')
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port,
+        'TEST': {'MIRROR': 'default'},
     }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['core.db.routers.ReplicaRouter']
+
+# Seconds a user reads from the primary after their data changes.
+REPLICA_PIN_SECONDS = float(os.environ.get('REPLICA_PIN_SECONDS', 5))
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHE_BACKEND = os.environ.get(
+    'CACHE_BACKEND',
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+PROCESS_LOCAL_CACHE_BACKENDS = [
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+]
+
+# Response and token caching are only enabled, and read replicas only
+# allowed, when every process shares the cache, so writes, revoked tokens
+# and replica pins are seen by all of them. Set CACHE_SHARED=1 to enable
+# them with a process-local cache in a single process.
+CACHE_SHARED = bool(int(os.environ.get(
+    'CACHE_SHARED',
+    CACHE_BACKEND not in PROCESS_LOCAL_CACHE_BACKENDS,
+)))
+
+# Memcached clients take no MAX_ENTRIES option.
+CACHE_BOUNDED = 'memcached' not in CACHE_BACKEND
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 10000)),
+        } if CACHE_BOUNDED else {},
+    },
+    'auth': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'auth'),
+        'KEY_PREFIX': 'auth',
+        'TIMEOUT': int(os.environ.get('TOKEN_AUTH_CACHE_TIMEOUT', 60)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('TOKEN_AUTH_CACHE_SIZE', 10000)),
+        } if CACHE_BOUNDED else {},
+    },
 }
 
+RECIPE_RESPONSE_CACHE_TIMEOUT = int(
+    os.environ.get('RECIPE_RESPONSE_CACHE_TIMEOUT', 300)
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -110,6 +210,20 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/3.2/topics/auth/passwords/
+
+PASSWORD_HASHERS = [
+    'user.hashers.PooledPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get('PASSWORD_HASH_QUEUE_SIZE', 8))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
 
@@ -133,6 +247,26 @@ MEDIA_URL = '/static/media/'
 STATIC_ROOT = '/vol/web/static'
 MEDIA_ROOT = '/vol/web/media'
 
+RECIPE_IMAGE_MAX_SIZE = int(
+    os.environ.get('RECIPE_IMAGE_MAX_SIZE', 10 * 1024 * 1024)
+)
+
+RECIPE_IMPORT_ROOT = os.environ.get('RECIPE_IMPORT_ROOT', '/vol/web/imports')
+RECIPE_IMPORT_MAX_SIZE = int(
+    os.environ.get('RECIPE_IMPORT_MAX_SIZE', 512 * 1024 * 1024)
+)
+RECIPE_IMPORT_BATCH_SIZE = int(
+    os.environ.get('RECIPE_IMPORT_BATCH_SIZE', 1000)
+)
+
+
+# Background jobs
+
+JOB_VISIBILITY_TIMEOUT = int(os.environ.get('JOB_VISIBILITY_TIMEOUT', 300))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+JOB_RETRY_DELAY = int(os.environ.get('JOB_RETRY_DELAY', 10))
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -144,6 +278,15 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+API_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', 100))
+RECIPE_EXPORT_CHUNK_SIZE = int(
+    os.environ.get('RECIPE_EXPORT_CHUNK_SIZE', 2000)
+)
+
 SPECTACULAR_SETTINGS = {
     'COMPONENT_SPLIT_REQUEST': True,
 }
+
+# Schema written by the generate_schema command. Without it the schema is
+# generated on first use in each process.
+API_SCHEMA_FILE = os.environ.get('API_SCHEMA_FILE', '')
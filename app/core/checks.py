@@ -0,0 +1,20 @@
+"""
+System checks for the core app.
+"""
+from django.conf import settings
+from django.core.checks import (Error, register)
+
+
+@register()
+def check_replica_pinning(app_configs, **kwargs):
+    """Check replicas are only used with a cache shared by all processes."""
+    if settings.REPLICA_DATABASES and not settings.CACHE_SHARED:
+        return [Error(
+            'Read replicas need a cache shared by all processes to pin '
+            'users who wrote to the primary.',
+            hint='Set CACHE_BACKEND to a shared cache such as memcached, '
+                 'or CACHE_SHARED=1 to run a single process.',
+            id='core.E001',
+        )]
+
+    return []
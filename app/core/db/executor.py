@@ -0,0 +1,56 @@
+"""
+Running database work from async code.
+
+Django 3.2's ORM is synchronous only, so async views hand their queries
+to a pool of worker threads sized to the connection pool. Each call
+returns the thread's connections to the pool when it finishes, so idle
+workers never hold connections.
+"""
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the database worker threads of the current process."""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_DB_THREADS,
+                thread_name_prefix='async-db',
+            )
+            _executor_pid = os.getpid()
+
+    return _executor
+
+
+def database_sync_to_async(func):
+    """Wrap a function using the database to be awaited from async code."""
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            connections.close_all()
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await sync_to_async(
+            run,
+            thread_sensitive=False,
+            executor=get_executor(),
+        )(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,112 @@
+"""
+Middleware choosing the database a request reads from.
+"""
+import asyncio
+import random
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from core.db.routers import (is_pinned, pin_user, read_database)
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def request_user(request):
+    """Return the authenticated user of a request, or None."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+
+    return user
+
+
+class ReplicaPinningMiddleware:
+    """Read from a replica unless the user is writing or recently wrote.
+
+    Token authentication only runs inside the view, so it checks the
+    pin of its user there; users logged in with a session are checked
+    here.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if not settings.REPLICA_DATABASES:
+            return self.get_response(request)
+
+        token = read_database.set(self.choose_database(request))
+        try:
+            response = self.get_response(request)
+            database = read_database.get()
+        finally:
+            read_database.reset(token)
+
+        return self.finish(request, response, database)
+
+    async def __acall__(self, request):
+        """Async version of __call__, keeping cache calls off the loop."""
+        if not settings.REPLICA_DATABASES:
+            return await self.get_response(request)
+
+        token = read_database.set(await sync_to_async(
+            self.choose_database,
+            thread_sensitive=False,
+        )(request))
+        try:
+            response = await self.get_response(request)
+            database = read_database.get()
+        finally:
+            read_database.reset(token)
+
+        return await sync_to_async(
+            self.finish,
+            thread_sensitive=False,
+        )(request, response, database)
+
+    def choose_database(self, request):
+        """Return the database to read from, or None for the primary."""
+        if request.method not in SAFE_METHODS:
+            return None
+        if request.COOKIES.get(settings.SESSION_COOKIE_NAME):
+            user = request_user(request)
+            if user and is_pinned(user.id):
+                return None
+
+        return random.choice(settings.REPLICA_DATABASES)
+
+    def finish(self, request, response, database):
+        """Pin writing users and keep streamed reads on the database."""
+        if request.method not in SAFE_METHODS:
+            user = request_user(request)
+            if user:
+                pin_user(user.id)
+        if response.streaming:
+            response.streaming_content = _stream(
+                database,
+                response.streaming_content,
+            )
+
+        return response
+
+
+def _stream(database, content):
+    """Yield a streaming response with its request's read database set."""
+    iterator = iter(content)
+    while True:
+        token = read_database.set(database)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            read_database.reset(token)
+        yield chunk
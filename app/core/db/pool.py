@@ -0,0 +1,265 @@
+"""
+Process-wide pool of Postgres connections.
+
+Django opens a connection per thread and, with CONN_MAX_AGE=0, closes it
+at the end of every request. The pooled backend hands those connections
+back here instead, so a request only pays for a checkout. The pool is
+capped at max_size open connections per process; checkouts wait up to
+timeout seconds for a free one.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+import psycopg2
+from psycopg2 import extensions
+
+
+_pools = {}
+_pools_pid = None
+_inherited = []
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """Raised when no connection is freed before the checkout timeout."""
+
+
+class ConnectionPool:
+    """Bounded pool of connections, most recently used first.
+
+    Connections idle for more than check_after seconds are pinged before
+    being handed out. Connections idle for more than max_idle seconds are
+    closed on the next checkout, keeping min_size of them, and those open
+    for more than max_lifetime seconds are closed when returned.
+    """
+
+    def __init__(self, min_size=0, max_size=10, timeout=5.0, max_idle=300.0,
+                 max_lifetime=3600.0, check_after=1.0):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check_after = check_after
+
+        self._idle = deque()
+        self._opened_at = {}
+        self._size = 0
+        self._waiting = 0
+        self._cond = threading.Condition()
+        self._counters = dict.fromkeys([
+            'opened', 'closed', 'checkouts', 'timeouts', 'failed_checks',
+            'evicted', 'wait_us',
+        ], 0)
+
+    def getconn(self, connect):
+        """Check out a connection, calling connect() to open one if needed."""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        while True:
+            conn, released = self._reserve(deadline)
+            if conn is None:
+                conn = self._open(connect)
+            elif time.monotonic() - released > self.check_after \
+                    and not self._check(conn):
+                self._discard(conn, 'failed_checks')
+                continue
+
+            with self._cond:
+                self._counters['checkouts'] += 1
+                self._counters['wait_us'] += int(
+                    (time.monotonic() - start) * 1e6
+                )
+            return conn
+
+    def putconn(self, conn, reset=False):
+        """Return a connection, closing it if it cannot be reused.
+
+        reset closes any holdable cursors left open on the connection.
+        """
+        try:
+            if reset:
+                self._rollback(conn)
+                with conn.cursor() as cursor:
+                    cursor.execute('CLOSE ALL')
+            self._rollback(conn)
+        except psycopg2.Error:
+            self._discard(conn, 'failed_checks')
+            return
+
+        now = time.monotonic()
+        if now - self._opened_at.get(id(conn), now) > self.max_lifetime:
+            self._discard(conn, 'evicted')
+            return
+
+        with self._cond:
+            self._idle.append((conn, now))
+            self._cond.notify()
+
+    def discard(self, conn):
+        """Close a checked out connection instead of returning it."""
+        self._discard(conn, None)
+
+    def close(self):
+        """Close all idle connections."""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn, released in idle:
+            self._discard(conn, None)
+
+    def stats(self):
+        """Return the pool's size and counters."""
+        with self._cond:
+            checkouts = self._counters['checkouts']
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'waiting': self._waiting,
+                **{
+                    name: value for name, value in self._counters.items()
+                    if name != 'wait_us'
+                },
+                'mean_wait_ms': self._counters['wait_us'] / checkouts / 1000
+                if checkouts else 0,
+            }
+
+    def _reserve(self, deadline):
+        """Take an idle connection, or a slot to open one, before deadline.
+
+        Returns the connection and when it was released, or None and the
+        current time for a slot.
+        """
+        expired = []
+        try:
+            with self._cond:
+                self._waiting += 1
+                try:
+                    while True:
+                        expired += self._expire_idle()
+                        if self._idle:
+                            return self._idle.pop()
+                        if self._size < self.max_size:
+                            self._size += 1
+                            return None, time.monotonic()
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._counters['timeouts'] += 1
+                            raise PoolTimeout(
+                                f'No database connection became free '
+                                f'within {self.timeout}s '
+                                f'({self.max_size} in use).'
+                            )
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+        finally:
+            for conn in expired:
+                self._close(conn)
+
+    def _expire_idle(self):
+        """Remove and return idle connections past max_idle.
+
+        The oldest releases are at the left of the queue. Called with the
+        lock held; the connections' slots are freed straight away.
+        """
+        expired = []
+        now = time.monotonic()
+        while len(self._idle) > self.min_size \
+                and now - self._idle[0][1] > self.max_idle:
+            conn = self._idle.popleft()[0]
+            self._opened_at.pop(id(conn), None)
+            self._size -= 1
+            self._counters['closed'] += 1
+            self._counters['evicted'] += 1
+            expired.append(conn)
+            self._cond.notify()
+        return expired
+
+    def _open(self, connect):
+        """Open a connection in a reserved slot."""
+        try:
+            conn = connect()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._opened_at[id(conn)] = time.monotonic()
+            self._counters['opened'] += 1
+        return conn
+
+    def _rollback(self, conn):
+        """End any transaction left open on a connection."""
+        status = conn.get_transaction_status() if not conn.closed \
+            else extensions.TRANSACTION_STATUS_UNKNOWN
+        if status in (
+            extensions.TRANSACTION_STATUS_INTRANS,
+            extensions.TRANSACTION_STATUS_INERROR,
+        ):
+            conn.rollback()
+        elif status != extensions.TRANSACTION_STATUS_IDLE:
+            raise psycopg2.InterfaceError('Connection is not idle.')
+
+    def _check(self, conn):
+        """Return whether a connection still answers a query."""
+        if conn.closed:
+            return False
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            self._rollback(conn)
+        except psycopg2.Error:
+            return False
+        return True
+
+    def _close(self, conn):
+        """Close a connection whose slot is already freed."""
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def _discard(self, conn, reason):
+        """Close a connection and free its slot."""
+        self._close(conn)
+        with self._cond:
+            self._opened_at.pop(id(conn), None)
+            self._size -= 1
+            self._counters['closed'] += 1
+            if reason:
+                self._counters[reason] += 1
+            self._cond.notify()
+
+
+def get_pool(key, **options):
+    """Return the pool of the current process for a connection key."""
+    global _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            # Connections inherited from a parent process share its sockets.
+            # Closing them would end the parent's sessions, so they are kept
+            # referenced and never used.
+            _inherited.extend(_pools.values())
+            _pools.clear()
+            _pools_pid = os.getpid()
+        if key not in _pools:
+            _pools[key] = ConnectionPool(**options)
+        return _pools[key]
+
+
+def close_pools(dbname=None):
+    """Close the idle connections of every pool, or of one database's."""
+    with _pools_lock:
+        pools = [
+            pool for key, pool in _pools.items()
+            if dbname is None or dict(key).get('database') == dbname
+        ]
+    for pool in pools:
+        pool.close()
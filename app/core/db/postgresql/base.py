@@ -0,0 +1,62 @@
+"""
+PostgreSQL backend drawing its connections from a pool.
+
+Configure the pool with OPTIONS['pool'], a dict of ConnectionPool
+arguments. Keep CONN_MAX_AGE at 0 so connections go back to the pool at
+the end of each request instead of staying with their thread.
+"""
+from django.db.backends.postgresql import base
+
+from core.db.pool import get_pool
+from core.db.postgresql.creation import DatabaseCreation
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool = None
+        self.holdable_cursors = False
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        options = self.settings_dict['OPTIONS']
+        self.pool = get_pool(
+            tuple(sorted(conn_params.items())),
+            **options.get('pool', {}),
+        )
+        connection = self.pool.getconn(
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params,
+            ),
+        )
+        self.isolation_level = options.get(
+            'isolation_level',
+            connection.isolation_level,
+        )
+        self.holdable_cursors = False
+        return connection
+
+    def create_cursor(self, name=None):
+        if name:
+            self.holdable_cursors = True
+        return super().create_cursor(name)
+
+    def _close(self):
+        if self.connection is None:
+            return
+
+        with self.wrap_database_errors:
+            if self.in_atomic_block:
+                # Django keeps hold of connections closed in a transaction.
+                self.pool.discard(self.connection)
+            else:
+                self.pool.putconn(
+                    self.connection,
+                    reset=self.holdable_cursors,
+                )
@@ -0,0 +1,77 @@
+"""
+Routing of reads to replica databases.
+
+ReplicaPinningMiddleware records how each request may read: reads made
+while serving a GET, HEAD or OPTIONS request go to one replica, chosen
+per request; everything else, including reads by jobs and commands,
+goes to the primary. Users whose data changed within
+REPLICA_PIN_SECONDS read from the primary too, so they see their own
+writes before the replicas catch up. Pins are kept in the default cache
+by user, so they reach every process and cover writes made by jobs.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+
+PIN_KEY = 'db:pin:{user_id}'
+
+read_database = ContextVar('read_database', default=None)
+
+
+def pin_user(user_id):
+    """Send the user's reads to the primary for REPLICA_PIN_SECONDS.
+
+    Pins are set even without replicas, as processes such as the job
+    worker may write without being configured to read from them.
+    """
+    cache.set(
+        PIN_KEY.format(user_id=user_id),
+        True,
+        settings.REPLICA_PIN_SECONDS,
+    )
+
+
+def is_pinned(user_id):
+    """Return whether the user's reads go to the primary."""
+    return bool(cache.get(PIN_KEY.format(user_id=user_id)))
+
+
+def read_pinned(user_id):
+    """Read from the primary for the rest of the request if pinned."""
+    if read_database.get() and is_pinned(user_id):
+        read_database.set(None)
+
+
+@contextmanager
+def primary():
+    """Read from the primary within the block."""
+    token = read_database.set(None)
+    try:
+        yield
+    finally:
+        read_database.reset(token)
+
+
+class ReplicaRouter:
+    """Send reads to the replica chosen for the current request."""
+
+    def db_for_read(self, model, **hints):
+        return read_database.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
@@ -0,0 +1,172 @@
+"""
+Background jobs queued in Postgres.
+
+Jobs are rows in core_job naming an importable function and its keyword
+arguments. Workers claim due jobs with SELECT ... FOR UPDATE SKIP LOCKED,
+so concurrent workers never claim the same job, and hide them for a
+visibility timeout. Long jobs renew that timeout with touch() as they
+make progress, so a job only becomes due again once its worker stops
+renewing it, for instance because it died.
+"""
+import logging
+import traceback
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.models import Job
+
+
+logger = logging.getLogger(__name__)
+
+current_job = ContextVar('current_job', default=None)
+
+
+class JobSuperseded(Exception):
+    """Raised by a job that another worker has taken over."""
+
+
+def job_name(func):
+    """Return the name a job function is queued under."""
+    return f'{func.__module__}.{func.__qualname__}'
+
+
+def enqueue(func, user_id=None, max_attempts=None, **payload):
+    """Queue a call of func with JSON serializable keyword arguments.
+
+    The job becomes visible to workers when the current transaction
+    commits, so work queued alongside a write never runs without it.
+    """
+    return Job.objects.create(
+        name=job_name(func),
+        user_id=user_id,
+        payload=payload,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def claim(limit=1, timeout=None):
+    """Claim and return up to limit due jobs."""
+    timeout = timeout or settings.JOB_VISIBILITY_TIMEOUT
+    now = timezone.now()
+
+    with transaction.atomic():
+        jobs = list(
+            Job.objects
+            .select_for_update(skip_locked=True)
+            .filter(status__in=[Job.QUEUED, Job.RUNNING], run_after__lte=now)
+            .order_by('run_after')[:limit]
+        )
+        expired = [job for job in jobs if job.attempts >= job.max_attempts]
+        if expired:
+            Job.objects.filter(id__in=[job.id for job in expired]).update(
+                status=Job.FAILED,
+                error='Timed out without finishing.',
+                finished_at=now,
+            )
+
+        jobs = [job for job in jobs if job.attempts < job.max_attempts]
+        Job.objects.filter(id__in=[job.id for job in jobs]).update(
+            status=Job.RUNNING,
+            attempts=F('attempts') + 1,
+            run_after=now + timedelta(seconds=timeout),
+            started_at=now,
+        )
+
+    for job in jobs:
+        job.status = Job.RUNNING
+        job.attempts += 1
+        job.started_at = now
+        job.timeout = timeout
+
+    return jobs
+
+
+def _claimed(job):
+    """Return a queryset of job while this worker still holds its claim."""
+    return Job.objects.filter(
+        id=job.id,
+        status=Job.RUNNING,
+        attempts=job.attempts,
+    )
+
+
+def _renew(job):
+    """Renew the claim on job and return whether this worker holds it."""
+    timeout = getattr(job, 'timeout', None) or \
+        settings.JOB_VISIBILITY_TIMEOUT
+    return bool(_claimed(job).update(
+        run_after=timezone.now() + timedelta(seconds=timeout),
+    ))
+
+
+def touch():
+    """Renew the claim on the running job and return whether it is held.
+
+    Does nothing outside a job.
+    """
+    job = current_job.get()
+    return job is None or _renew(job)
+
+
+def run_job(job):
+    """Run a claimed job, record the outcome and return whether it passed.
+
+    Failed jobs are retried with exponential backoff until they reach
+    max_attempts. A job raising JobSuperseded is queued again without
+    counting the attempt. The claim is renewed before the job starts, as
+    jobs claimed in a batch may wait past their timeout, and a job
+    claimed by another worker meanwhile is skipped. The outcome is only
+    recorded while this worker still holds the claim.
+    """
+    if not _renew(job):
+        logger.info('Job %s (%s) was claimed by another worker', job.id,
+                    job.name)
+        return False
+
+    claimed = _claimed(job)
+    token = current_job.set(job)
+    try:
+        result = import_string(job.name)(**job.payload)
+    except JobSuperseded as exc:
+        logger.info('Job %s (%s) superseded: %s', job.id, job.name, exc)
+        claimed.update(
+            status=Job.QUEUED,
+            attempts=F('attempts') - 1,
+            run_after=timezone.now() + timedelta(
+                seconds=settings.JOB_RETRY_DELAY,
+            ),
+        )
+        return False
+    except Exception:
+        logger.exception('Job %s (%s) failed', job.id, job.name)
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            claimed.update(
+                status=Job.FAILED,
+                error=error,
+                finished_at=timezone.now(),
+            )
+        else:
+            delay = settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            claimed.update(
+                status=Job.QUEUED,
+                error=error,
+                run_after=timezone.now() + timedelta(seconds=delay),
+            )
+        return False
+    finally:
+        current_job.reset(token)
+
+    claimed.update(
+        status=Job.SUCCEEDED,
+        result=result,
+        error='',
+        finished_at=timezone.now(),
+    )
+    return True
@@ -0,0 +1,76 @@
+"""
+Django command to benchmark the latency of an API endpoint.
+"""
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import URLError
+
+from django.core.management.base import BaseCommand
+
+
+def percentile(values, pct):
+    """Return the pct percentile of a sorted list of values."""
+    index = round(pct / 100 * (len(values) - 1))
+    return values[index]
+
+
+class Command(BaseCommand):
+    """Django command to benchmark an API endpoint."""
+    help = 'Send repeated requests to an endpoint and report latency.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('url')
+        parser.add_argument('--method', default='GET')
+        parser.add_argument('--data', help='Path to a JSON request body.')
+        parser.add_argument('--token', help='Auth token for the requests.')
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--concurrency', type=int, default=1)
+
+    def _send(self, url, method, body, headers):
+        """Send one request and return its latency and success."""
+        request = urllib.request.Request(
+            url, data=body, headers=headers, method=method,
+        )
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as res:
+                res.read()
+            ok = True
+        except URLError:
+            ok = False
+
+        return time.perf_counter() - start, ok
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        headers = {'Content-Type': 'application/json'}
+        if options['token']:
+            headers['Authorization'] = f'Token {options["token"]}'
+
+        body = None
+        if options['data']:
+            with open(options['data'], 'rb') as data_file:
+                body = data_file.read()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            results = list(pool.map(
+                lambda _: self._send(
+                    options['url'], options['method'].upper(), body, headers,
+                ),
+                range(options['requests']),
+            ))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency * 1000 for latency, ok in results)
+        failed = sum(1 for latency, ok in results if not ok)
+
+        self.stdout.write(f'Requests: {len(results)} ({failed} failed)')
+        self.stdout.write(f'Throughput: {len(results) / elapsed:.1f} req/s')
+        self.stdout.write(
+            f'Latency: mean {sum(latencies) / len(latencies):.1f} ms, '
+            f'p50 {percentile(latencies, 50):.1f} ms, '
+            f'p95 {percentile(latencies, 95):.1f} ms, '
+            f'p99 {percentile(latencies, 99):.1f} ms'
+        )
@@ -0,0 +1,49 @@
+"""
+Django command to export a user's recipes as NDJSON.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import (BaseCommand, CommandError)
+
+from core.models import Recipe
+from recipe.export import export_lines
+from recipe.serializers import RecipeDetailSerializer
+
+
+class Command(BaseCommand):
+    """Django command to export recipes."""
+    help = 'Write every recipe of a user, with tags and ingredients, as ' \
+           'newline delimited JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('email')
+        parser.add_argument(
+            '--output',
+            help='File to write to instead of standard output.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.RECIPE_EXPORT_CHUNK_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        try:
+            user = get_user_model().objects.get(email=options['email'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'No user with email {options["email"]}')
+
+        queryset = Recipe.objects.filter(user=user).order_by('id')
+        lines = export_lines(
+            queryset,
+            RecipeDetailSerializer(),
+            options['chunk_size'],
+        )
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.writelines(lines)
+        else:
+            for chunk in lines:
+                self.stdout.write(chunk, ending='')
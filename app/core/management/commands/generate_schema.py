@@ -0,0 +1,34 @@
+"""
+Django command to generate the OpenAPI schema file.
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import (BaseCommand, CommandError)
+
+from core.schema import (clear_schema, generate_schema, write_schema)
+
+
+class Command(BaseCommand):
+    """Django command to generate the OpenAPI schema."""
+    help = 'Generate the OpenAPI schema and write it as JSON to the given ' \
+           'path or API_SCHEMA_FILE, where /api/schema/ serves it from.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        path = options['path'] or settings.API_SCHEMA_FILE
+        if not path:
+            raise CommandError('Give a path or set API_SCHEMA_FILE.')
+
+        start = time.monotonic()
+        schema = generate_schema()
+        write_schema(path, schema)
+        clear_schema()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote schema with {len(schema["paths"])} paths to {path} in '
+            f'{time.monotonic() - start:.2f}s'
+        ))
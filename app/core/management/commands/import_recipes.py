@@ -0,0 +1,87 @@
+"""
+Django command to import recipes from an NDJSON or CSV file.
+"""
+import os
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import (BaseCommand, CommandError)
+
+from core.models import RecipeImport
+from recipe.imports import run_import
+
+
+class Command(BaseCommand):
+    """Django command to import recipes."""
+    help = 'Import recipes for a user from a newline delimited JSON or CSV ' \
+           'file, in batches. An interrupted import continues from its ' \
+           'last batch when run again with --resume.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('email')
+        parser.add_argument('path', nargs='?')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.RECIPE_IMPORT_BATCH_SIZE,
+        )
+        parser.add_argument(
+            '--resume',
+            type=int,
+            metavar='IMPORT_ID',
+            help='Continue an earlier import instead of starting one.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        try:
+            user = get_user_model().objects.get(email=options['email'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'No user with email {options["email"]}')
+
+        if options['resume']:
+            try:
+                recipe_import = RecipeImport.objects.get(
+                    id=options['resume'],
+                    user=user,
+                )
+            except RecipeImport.DoesNotExist:
+                raise CommandError(f'No import {options["resume"]}')
+        elif options['path']:
+            if not os.path.isfile(options['path']):
+                raise CommandError(f'No file {options["path"]}')
+            recipe_import = RecipeImport.objects.create(
+                user=user,
+                source=os.path.abspath(options['path']),
+            )
+        else:
+            raise CommandError('Give a file to import or --resume.')
+
+        self.stdout.write(
+            f'Import {recipe_import.id} of {recipe_import.source} from '
+            f'record {recipe_import.processed}'
+        )
+        start = time.monotonic()
+        first = recipe_import.processed
+
+        def report(progress):
+            rate = (progress.processed - first) / \
+                max(time.monotonic() - start, 1e-6)
+            self.stdout.write(
+                f'{progress.processed} records, {progress.created} created, '
+                f'{progress.failed} failed ({rate:.0f} records/s)'
+            )
+
+        result = run_import(
+            recipe_import.id,
+            batch_size=options['batch_size'],
+            report=report,
+        )
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result["created"]} recipes, {result["failed"]} '
+            f'failed, in {elapsed:.1f}s '
+            f'({(result["processed"] - first) / max(elapsed, 1e-6):.0f} '
+            f'records/s)'
+        ))
@@ -0,0 +1,86 @@
+"""
+Django command to run queued background jobs.
+"""
+import logging
+import multiprocessing
+import signal
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import (DatabaseError, connections)
+
+from core.jobs import (claim, run_job)
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Django command to run background jobs."""
+    help = 'Run queued background jobs in one or more worker processes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1)
+        parser.add_argument('--batch-size', type=int, default=1)
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument(
+            '--timeout',
+            type=int,
+            default=settings.JOB_VISIBILITY_TIMEOUT,
+            help='Seconds a claimed job stays hidden from other workers.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no job is due instead of polling.',
+        )
+
+    def work(self, options):
+        """Claim and run jobs until none are due or the worker is stopped."""
+        ran = failed = 0
+        while True:
+            try:
+                jobs = claim(options['batch_size'], options['timeout'])
+                for job in jobs:
+                    ran += 1
+                    failed += not run_job(job)
+            except DatabaseError:
+                logger.exception('Job worker lost its database connection')
+                connections.close_all()
+                jobs = []
+
+            if not jobs:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+
+        self.stdout.write(f'Ran {ran} jobs, {failed} failed')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if options['processes'] == 1:
+            self.work(options)
+            return
+
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        workers = [
+            context.Process(target=self.work, args=(options,))
+            for i in range(options['processes'])
+        ]
+        signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+        for worker in workers:
+            worker.start()
+
+        try:
+            for worker in workers:
+                worker.join()
+        finally:
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+                    worker.join()
+
+        self.stdout.write(self.style.SUCCESS('Workers stopped'))
@@ -0,0 +1,69 @@
+"""
+Django command to seed sample recipes for benchmarking.
+"""
+import random
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from core.models import Recipe
+
+
+WORDS = [
+    'apple', 'basil', 'bean', 'beef', 'bread', 'broccoli', 'butter',
+    'cabbage', 'carrot', 'cheese', 'chicken', 'chili', 'coconut', 'corn',
+    'cream', 'curry', 'dumpling', 'egg', 'fennel', 'fish', 'garlic',
+    'ginger', 'honey', 'kale', 'lamb', 'leek', 'lemon', 'lentil', 'lime',
+    'mango', 'miso', 'mushroom', 'noodle', 'oat', 'onion', 'orange',
+    'pasta', 'peanut', 'pepper', 'pesto', 'pork', 'potato', 'prawn',
+    'pumpkin', 'rice', 'salmon', 'sesame', 'soup', 'spinach', 'squash',
+    'stew', 'tofu', 'tomato', 'tuna', 'walnut', 'yogurt', 'zucchini',
+]
+STYLES = [
+    'baked', 'braised', 'crispy', 'fried', 'grilled', 'roasted', 'slow',
+    'smoked', 'spicy', 'steamed', 'stir', 'sweet',
+]
+
+
+class Command(BaseCommand):
+    """Django command to seed recipes."""
+    help = 'Create sample recipes for a user in bulk.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('email')
+        parser.add_argument('--count', type=int, default=1000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def _recipe(self, rng, user):
+        """Return an unsaved random recipe."""
+        title = ' '.join(
+            [rng.choice(STYLES)] + rng.sample(WORDS, rng.randint(1, 3))
+        )
+        description = ' '.join(rng.choices(WORDS + STYLES, k=20))
+        return Recipe(
+            user=user,
+            title=title.capitalize(),
+            description=f'{description.capitalize()}.',
+            time_minutes=rng.randint(5, 240),
+            price=Decimal(rng.randint(100, 9999)) / 100,
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        user, created = get_user_model().objects.get_or_create(
+            email=options['email'],
+        )
+        rng = random.Random(options['seed'])
+        count = options['count']
+        batch_size = options['batch_size']
+
+        for start in range(0, count, batch_size):
+            size = min(batch_size, count - start)
+            Recipe.objects.bulk_create(
+                [self._recipe(rng, user) for i in range(size)]
+            )
+            self.stdout.write(f'Created {start + size} of {count} recipes')
+
+        self.stdout.write(self.style.SUCCESS('Seeding complete!'))
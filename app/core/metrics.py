@@ -0,0 +1,120 @@
+"""
+Per-route request metrics in Prometheus format.
+
+Histograms are kept by prometheus_client. When PROMETHEUS_MULTIPROC_DIR
+is set, as it must be for servers with several worker processes, each
+process writes its samples to a memory mapped file in that directory and
+/metrics merges them; otherwise they stay in process memory. The
+directory must be emptied before the server starts, or samples of
+earlier runs are merged in too.
+
+Statistics counters read by the API, such as cache hits, are kept in
+the default cache instead.
+"""
+import os
+import time
+from contextvars import ContextVar
+
+from django.core.cache import cache
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+
+LABELS = ['route', 'method']
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds',
+    'Time to serve a request, including streaming its response.',
+    LABELS,
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries',
+    'Database queries made while serving a request.',
+    LABELS,
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, float('inf')),
+)
+REQUEST_DB_SECONDS = Histogram(
+    'http_request_db_duration_seconds',
+    'Time spent in database queries while serving a request.',
+    LABELS,
+)
+RESPONSE_BYTES = Histogram(
+    'http_response_size_bytes',
+    'Size of response bodies.',
+    LABELS,
+    buckets=tuple(256 * 4 ** power for power in range(9)) + (float('inf'),),
+)
+RESPONSES = Counter(
+    'http_responses',
+    'Responses by status code.',
+    LABELS + ['status'],
+)
+
+request_metrics = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Measurements of one request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.size = 0
+
+    def observe(self, route, method, status):
+        """Record the request in the histograms."""
+        labels = {'route': route, 'method': method}
+        REQUEST_SECONDS.labels(**labels).observe(
+            time.perf_counter() - self.start
+        )
+        REQUEST_QUERIES.labels(**labels).observe(self.queries)
+        REQUEST_DB_SECONDS.labels(**labels).observe(self.db_seconds)
+        RESPONSE_BYTES.labels(**labels).observe(self.size)
+        RESPONSES.labels(status=status, **labels).inc()
+
+
+def method_label(method):
+    """Return the label of a request method, 'other' for unknown ones."""
+    return method if method in METHODS else 'other'
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper counting queries of the current request."""
+    metrics = request_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_seconds += time.perf_counter() - start
+
+
+def increment_counter(key, delta=1):
+    """Increment a statistics counter in the default cache."""
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        cache.set(key, delta, None)
+
+
+def render_metrics():
+    """Return the metrics of all processes in Prometheus text format."""
+    registry = REGISTRY
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+
+    return generate_latest(registry), CONTENT_TYPE_LATEST
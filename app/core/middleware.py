@@ -0,0 +1,82 @@
+"""
+Middleware recording request metrics.
+"""
+import asyncio
+
+from core.metrics import (RequestMetrics, method_label, request_metrics)
+
+
+class MetricsMiddleware:
+    """Record latency, queries, DB time and size per resolved route.
+
+    Streamed responses are recorded once they finish streaming.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        metrics = RequestMetrics()
+        token = request_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_metrics.reset(token)
+
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        """Async version of __call__."""
+        metrics = RequestMetrics()
+        token = request_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_metrics.reset(token)
+
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        """Record the request, after streaming for streamed responses."""
+        match = request.resolver_match
+        labels = (
+            match.view_name if match else 'unmatched',
+            method_label(request.method),
+            response.status_code,
+        )
+        if response.streaming:
+            response.streaming_content = _stream(
+                metrics,
+                labels,
+                response.streaming_content,
+            )
+        else:
+            metrics.size = len(response.content)
+            metrics.observe(*labels)
+
+        return response
+
+
+def _stream(metrics, labels, content):
+    """Yield a streaming response, measuring it until it ends."""
+    iterator = iter(content)
+    try:
+        while True:
+            token = request_metrics.set(metrics)
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                request_metrics.reset(token)
+            metrics.size += len(chunk)
+            yield chunk
+    finally:
+        metrics.observe(*labels)
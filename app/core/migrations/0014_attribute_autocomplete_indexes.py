@@ -0,0 +1,39 @@
+# Generated by Django 3.2.25 on 2026-10-18 01:05
+
+from django.contrib.postgres.operations import (
+    BtreeGinExtension,
+    TrigramExtension,
+)
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_recipeimport'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        BtreeGinExtension(),
+        migrations.RunSQL(
+            sql='CREATE INDEX core_tag_user_prefix_idx '
+                'ON core_tag (user_id, lower(name) COLLATE "C");',
+            reverse_sql='DROP INDEX core_tag_user_prefix_idx;',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX core_ingredient_user_prefix_idx '
+                'ON core_ingredient (user_id, lower(name) COLLATE "C");',
+            reverse_sql='DROP INDEX core_ingredient_user_prefix_idx;',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX core_tag_user_trgm_idx '
+                'ON core_tag USING gin (user_id, name gin_trgm_ops);',
+            reverse_sql='DROP INDEX core_tag_user_trgm_idx;',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX core_ingredient_user_trgm_idx '
+                'ON core_ingredient USING gin (user_id, name gin_trgm_ops);',
+            reverse_sql='DROP INDEX core_ingredient_user_trgm_idx;',
+        ),
+    ]
@@ -0,0 +1,15 @@
+"""
+Pagination shared by the APIs.
+"""
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class ApiCursorPagination(CursorPagination):
+    """Keyset pagination with a page size set by the client or settings."""
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def get_page_size(self, request):
+        """Return the requested page size or the API_PAGE_SIZE setting."""
+        return super().get_page_size(request) or settings.API_PAGE_SIZE
@@ -0,0 +1,69 @@
+"""
+OpenAPI schema generated once and kept in memory.
+
+Generating the schema introspects every view and serializer, which takes
+hundreds of milliseconds. The schema is instead read from
+API_SCHEMA_FILE, written by the generate_schema command, or generated on
+first use, and each format is rendered once per process.
+"""
+import hashlib
+import json
+import os
+import threading
+
+from django.conf import settings
+from drf_spectacular.renderers import OpenApiJsonRenderer
+from drf_spectacular.settings import spectacular_settings
+
+
+_schema = None
+_rendered = {}
+_lock = threading.Lock()
+
+
+def generate_schema():
+    """Generate the public schema of the API."""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(
+        urlconf=spectacular_settings.SERVE_URLCONF,
+    )
+    return generator.get_schema(request=None, public=True)
+
+
+def write_schema(path, schema):
+    """Write a schema to path as JSON."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'wb') as schema_file:
+        schema_file.write(OpenApiJsonRenderer().render(schema))
+
+
+def get_schema():
+    """Return the schema, from API_SCHEMA_FILE when it exists."""
+    global _schema
+    with _lock:
+        if _schema is None:
+            path = settings.API_SCHEMA_FILE
+            if path and os.path.exists(path):
+                with open(path) as schema_file:
+                    _schema = json.load(schema_file)
+            else:
+                _schema = generate_schema()
+
+    return _schema
+
+
+def render_schema(renderer, media_type):
+    """Return the schema rendered for a media type and its ETag."""
+    if media_type not in _rendered:
+        content = renderer.render(get_schema(), media_type, {})
+        digest = hashlib.sha256(content).hexdigest()
+        _rendered[media_type] = (content, f'"{digest[:32]}"')
+
+    return _rendered[media_type]
+
+
+def clear_schema():
+    """Forget the schema so it is loaded again on next use."""
+    global _schema
+    with _lock:
+        _schema = None
+        _rendered.clear()
@@ -0,0 +1,20 @@
+"""
+Serializers for core APIs
+"""
+from rest_framework import serializers
+
+
+class PoolStatsSerializer(serializers.Serializer):
+    """Serializer for database connection pool statistics"""
+    max_size = serializers.IntegerField()
+    size = serializers.IntegerField()
+    idle = serializers.IntegerField()
+    in_use = serializers.IntegerField()
+    waiting = serializers.IntegerField()
+    opened = serializers.IntegerField()
+    closed = serializers.IntegerField()
+    checkouts = serializers.IntegerField()
+    timeouts = serializers.IntegerField()
+    failed_checks = serializers.IntegerField()
+    evicted = serializers.IntegerField()
+    mean_wait_ms = serializers.FloatField()
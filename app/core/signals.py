@@ -0,0 +1,14 @@
+"""
+Signal handlers for the core app.
+"""
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from core.metrics import record_query
+
+
+@receiver(connection_created)
+def record_request_queries(sender, connection, **kwargs):
+    """Count the queries of each connection towards its request."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
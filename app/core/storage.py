@@ -0,0 +1,58 @@
+"""
+Content-addressed file storage.
+"""
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.db import (DEFAULT_DB_ALIAS, connections)
+from django.utils.deconstruct import deconstructible
+
+
+def lock_content(name):
+    """Lock the digest of a stored file until the transaction ends.
+
+    Saving and releasing a file both take this lock, so a release cannot
+    delete a file that a concurrent save is reusing before the saving
+    transaction records its reference.
+    """
+    digest = os.path.splitext(os.path.basename(name))[0]
+    key = hashlib.sha256(digest.encode()).digest()[:8]
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_advisory_xact_lock(%s)',
+            [int.from_bytes(key, 'big', signed=True)],
+        )
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Store files under the SHA256 digest of their content.
+
+    The directory and extension come from the requested name. Saving
+    content that is already stored writes nothing and returns the existing
+    name, so identical uploads share one file. A sha256 attribute on the
+    content, set while streaming the upload, saves hashing it again.
+
+    Saving locks the digest with lock_content, so it should run in the
+    transaction that stores the reference to the file.
+    """
+
+    def save(self, name, content, max_length=None):
+        digest = getattr(content, 'sha256', None) or self._digest(content)
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        name = os.path.join(directory, f'{digest}{extension}')
+        lock_content(name)
+        if self.exists(name):
+            return name
+
+        return super().save(name, content, max_length)
+
+    def _digest(self, content):
+        """Return the SHA256 hex digest of the content."""
+        sha256 = hashlib.sha256()
+        for chunk in content.chunks():
+            sha256.update(chunk)
+
+        return sha256.hexdigest()
@@ -1,13 +1,23 @@
 """
 Test custom Django management commands.
 """
+import json
+import tempfile
+from io import StringIO
 from unittest.mock import patch
+from urllib.error import HTTPError
 
 from psycopg2 import OperationalError as Psycopg2OpError
 
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import (SimpleTestCase, TestCase, override_settings)
+
+from core.jobs import enqueue
+from core.models import (Job, Recipe, RecipeImport, Tag)
+from core.tests.test_jobs import (add, fail)
 
 
 @patch('core.management.commands.wait_for_db.Command.check')
@@ -32,3 +42,189 @@ class CommandTests(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=['default'])
+
+
+@patch('core.management.commands.benchmark_api.urllib.request.urlopen')
+class BenchmarkCommandTests(SimpleTestCase):
+    """Test the API benchmark command."""
+
+    def test_benchmark_reports_latency(self, patched_urlopen):
+        """Test benchmark sends every request and reports latency."""
+        out = StringIO()
+
+        call_command(
+            'benchmark_api', 'http://localhost:8000/api/recipe/recipes/',
+            '--requests', '10', '--concurrency', '2', '--token', 'abc',
+            stdout=out,
+        )
+
+        self.assertEqual(patched_urlopen.call_count, 10)
+        request = patched_urlopen.call_args[0][0]
+        self.assertEqual(request.get_header('Authorization'), 'Token abc')
+        self.assertIn('Requests: 10 (0 failed)', out.getvalue())
+        self.assertIn('p99', out.getvalue())
+
+    def test_benchmark_counts_failures(self, patched_urlopen):
+        """Test failed requests are counted."""
+        patched_urlopen.side_effect = HTTPError(
+            'http://localhost', 500, 'Server Error', {}, None,
+        )
+        out = StringIO()
+
+        call_command(
+            'benchmark_api', 'http://localhost:8000/api/recipe/recipes/',
+            '--requests', '3', stdout=out,
+        )
+
+        self.assertIn('Requests: 3 (3 failed)', out.getvalue())
+
+
+class SeedRecipesCommandTests(TestCase):
+    """Test the recipe seeding command."""
+
+    def test_seed_recipes(self):
+        """Test seeding creates searchable recipes in batches."""
+        out = StringIO()
+
+        call_command(
+            'seed_recipes', 'seed@example.com',
+            '--count', '25', '--batch-size', '10',
+            stdout=out,
+        )
+
+        recipes = Recipe.objects.filter(user__email='seed@example.com')
+        self.assertEqual(recipes.count(), 25)
+        self.assertFalse(recipes.filter(search_vector=None).exists())
+        self.assertIn('Created 25 of 25 recipes', out.getvalue())
+
+
+class RunJobsCommandTests(TestCase):
+    """Test the background job worker command."""
+
+    def test_run_jobs_once(self):
+        """Test the worker runs every due job and reports failures."""
+        enqueue(add, a=1, b=2)
+        enqueue(fail, max_attempts=1)
+        out = StringIO()
+
+        call_command('run_jobs', '--once', '--batch-size', '5', stdout=out)
+
+        self.assertIn('Ran 2 jobs, 1 failed', out.getvalue())
+        self.assertEqual(
+            sorted(Job.objects.values_list('status', flat=True)),
+            [Job.FAILED, Job.SUCCEEDED],
+        )
+
+
+class ExportRecipesCommandTests(TestCase):
+    """Test the recipe export command."""
+
+    def test_export_recipes(self):
+        """Test recipes are written as one JSON object per line."""
+        user = get_user_model().objects.create_user('user@example.com')
+        for i in range(3):
+            recipe = Recipe.objects.create(
+                user=user,
+                title=f'Recipe {i}',
+                time_minutes=5,
+                price='1.50',
+            )
+            recipe.tags.add(Tag.objects.create(user=user, name=f'Tag {i}'))
+        out = StringIO()
+
+        call_command(
+            'export_recipes', 'user@example.com', '--chunk-size', '2',
+            stdout=out,
+        )
+
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(
+            [line['title'] for line in lines],
+            ['Recipe 0', 'Recipe 1', 'Recipe 2'],
+        )
+        self.assertEqual(lines[2]['tags'], [
+            {'id': recipe.tags.get().id, 'name': 'Tag 2'},
+        ])
+        self.assertEqual(lines[0]['price'], '1.50')
+
+    def test_export_unknown_user(self):
+        """Test exporting for an unknown email fails."""
+        with self.assertRaises(CommandError):
+            call_command('export_recipes', 'missing@example.com')
+
+
+class ImportRecipesCommandTests(TestCase):
+    """Test the recipe import command."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('user@example.com')
+        self.source = tempfile.NamedTemporaryFile('w', suffix='.ndjson')
+        for i in range(5):
+            self.source.write(json.dumps({
+                'title': f'Recipe {i}',
+                'time_minutes': 5,
+                'price': '1.50',
+                'tags': [{'name': 'Dinner'}],
+            }) + '\n')
+        self.source.flush()
+
+    def tearDown(self):
+        self.source.close()
+
+    def test_import_recipes(self):
+        """Test recipes are imported in batches with progress output."""
+        out = StringIO()
+
+        call_command(
+            'import_recipes', 'user@example.com', self.source.name,
+            '--batch-size', '2', stdout=out,
+        )
+
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 5)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+        self.assertIn('4 records, 4 created', out.getvalue())
+        self.assertIn('Imported 5 recipes', out.getvalue())
+
+    def test_resume_import(self):
+        """Test resuming an import skips the records already imported."""
+        recipe_import = RecipeImport.objects.create(
+            user=self.user,
+            source=self.source.name,
+            processed=3,
+        )
+
+        call_command(
+            'import_recipes', 'user@example.com',
+            '--resume', str(recipe_import.id), stdout=StringIO(),
+        )
+
+        titles = Recipe.objects.order_by('id').values_list('title', flat=True)
+        self.assertEqual(list(titles), ['Recipe 3', 'Recipe 4'])
+
+    def test_import_unknown_file(self):
+        """Test importing a missing file fails."""
+        with self.assertRaises(CommandError):
+            call_command(
+                'import_recipes', 'user@example.com', '/missing.ndjson',
+            )
+
+
+class GenerateSchemaCommandTests(SimpleTestCase):
+    """Test the schema generation command."""
+
+    def test_generate_schema(self):
+        """Test the schema is written as JSON to the given path."""
+        with tempfile.TemporaryDirectory() as root:
+            path = f'{root}/schema/openapi.json'
+
+            call_command('generate_schema', path, stdout=StringIO())
+
+            with open(path) as schema_file:
+                schema = json.load(schema_file)
+        self.assertIn('/api/recipe/recipes/', schema['paths'])
+
+    @override_settings(API_SCHEMA_FILE='')
+    def test_generate_schema_requires_path(self):
+        """Test a path is required without API_SCHEMA_FILE."""
+        with self.assertRaises(CommandError):
+            call_command('generate_schema')
@@ -0,0 +1,236 @@
+"""
+Tests for background jobs.
+"""
+import threading
+from datetime import timedelta
+
+from django.db import (connection, transaction)
+from django.test import (TestCase, TransactionTestCase, override_settings)
+from django.utils import timezone
+
+from core.jobs import (
+    JobSuperseded,
+    claim,
+    enqueue,
+    job_name,
+    run_job,
+    touch,
+)
+from core.models import Job
+
+
+def add(a, b):
+    """Job returning the sum of its arguments."""
+    return a + b
+
+
+def fail():
+    """Job that always fails."""
+    raise ValueError('Job failed')
+
+
+def renew():
+    """Job renewing its claim, then counting the jobs others can claim."""
+    return [touch(), len(claim())]
+
+
+def lose_claim():
+    """Job whose claim is taken over by another worker while it runs."""
+    Job.objects.update(run_after=timezone.now())
+    claim()
+    return touch()
+
+
+def superseded():
+    """Job finding another worker has taken over its work."""
+    raise JobSuperseded('Taken over')
+
+
+class JobQueueTests(TestCase):
+    """Test queueing, claiming and running jobs."""
+
+    def test_enqueue(self):
+        """Test queueing a job stores its function and payload."""
+        job = enqueue(add, a=1, b=2)
+
+        self.assertEqual(job.name, 'core.tests.test_jobs.add')
+        self.assertEqual(job.name, job_name(add))
+        self.assertEqual(job.payload, {'a': 1, 'b': 2})
+        self.assertEqual(job.status, Job.QUEUED)
+
+    def test_run_records_result(self):
+        """Test a successful job records its result."""
+        enqueue(add, a=1, b=2)
+
+        job, = claim()
+        self.assertTrue(run_job(job))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.result, 3)
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_claimed_job_hidden(self):
+        """Test a claimed job is not claimed again before its timeout."""
+        enqueue(add, a=1, b=2)
+
+        self.assertEqual(len(claim()), 1)
+        self.assertEqual(claim(), [])
+
+    def test_future_job_not_claimed(self):
+        """Test jobs are only claimed once due."""
+        job = enqueue(add, a=1, b=2)
+        Job.objects.filter(id=job.id).update(
+            run_after=timezone.now() + timedelta(minutes=1),
+        )
+
+        self.assertEqual(claim(), [])
+
+    @override_settings(JOB_RETRY_DELAY=10)
+    def test_failed_job_retried_with_backoff(self):
+        """Test a failed job is queued again after a growing delay."""
+        enqueue(fail, max_attempts=3)
+
+        job, = claim()
+        before = timezone.now()
+        self.assertFalse(run_job(job))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertIn('Job failed', job.error)
+        self.assertGreaterEqual(job.run_after, before + timedelta(seconds=10))
+
+    def test_job_fails_after_max_attempts(self):
+        """Test a job stops retrying once it reaches max_attempts."""
+        job = enqueue(fail, max_attempts=2)
+
+        for attempt in range(2):
+            Job.objects.filter(id=job.id).update(run_after=timezone.now())
+            claimed, = claim()
+            run_job(claimed)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_expired_claim_reclaimed(self):
+        """Test a job whose worker died is claimed again after timeout."""
+        enqueue(add, a=1, b=2)
+        stale, = claim()
+        Job.objects.filter(id=stale.id).update(run_after=timezone.now())
+
+        job, = claim()
+
+        self.assertEqual(job.id, stale.id)
+        self.assertEqual(job.attempts, 2)
+
+    def test_expired_claim_at_max_attempts_failed(self):
+        """Test a timed out job on its last attempt is marked failed."""
+        enqueue(add, max_attempts=1, a=1, b=2)
+        stale, = claim()
+        Job.objects.filter(id=stale.id).update(run_after=timezone.now())
+
+        self.assertEqual(claim(), [])
+
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, Job.FAILED)
+
+    def test_stale_worker_cannot_record_outcome(self):
+        """Test a worker that lost its claim does not overwrite the job."""
+        enqueue(add, a=1, b=2)
+        stale, = claim()
+        Job.objects.filter(id=stale.id).update(run_after=timezone.now())
+        current, = claim()
+
+        run_job(stale)
+
+        current.refresh_from_db()
+        self.assertEqual(current.status, Job.RUNNING)
+
+    def test_batched_job_claim_checked_before_running(self):
+        """Test a job whose claim lapsed while queued in a batch is skipped."""
+        first = enqueue(add, a=1, b=2)
+        second = enqueue(add, a=3, b=4)
+        jobs = claim(limit=2, timeout=60)
+        Job.objects.filter(id=second.id).update(run_after=timezone.now())
+        current, = claim()
+
+        self.assertEqual([job.id for job in jobs], [first.id, second.id])
+        self.assertTrue(run_job(jobs[0]))
+        self.assertFalse(run_job(jobs[1]))
+
+        current.refresh_from_db()
+        self.assertEqual(current.status, Job.RUNNING)
+        self.assertIsNone(current.result)
+
+    def test_batched_job_claim_renewed_before_running(self):
+        """Test a lapsed claim nobody took over is renewed and run."""
+        enqueue(add, a=1, b=2)
+        job, = claim(timeout=60)
+        Job.objects.filter(id=job.id).update(run_after=timezone.now())
+
+        self.assertTrue(run_job(job))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+
+    def test_touch_renews_claim(self):
+        """Test touching a running job keeps it from being claimed again."""
+        job = enqueue(renew)
+        claimed, = claim(timeout=60)
+        Job.objects.filter(id=job.id).update(run_after=timezone.now())
+
+        self.assertTrue(run_job(claimed))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.result, [True, 0])
+
+    def test_touch_outside_job(self):
+        """Test touch does nothing outside a job."""
+        self.assertTrue(touch())
+
+    def test_touch_reports_lost_claim(self):
+        """Test touch returns False once another worker claims the job."""
+        enqueue(lose_claim)
+        stale, = claim()
+
+        run_job(stale)
+
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, Job.RUNNING)
+        self.assertEqual(stale.attempts, 2)
+
+    def test_superseded_attempt_not_counted(self):
+        """Test a superseded job is queued again without using an attempt."""
+        enqueue(superseded, max_attempts=1)
+
+        job, = claim()
+        self.assertFalse(run_job(job))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.attempts, 0)
+
+
+class SkipLockedTests(TransactionTestCase):
+    """Test concurrent workers never claim the same job."""
+
+    def test_locked_job_skipped(self):
+        """Test a job locked by another worker is skipped, not waited on."""
+        first = enqueue(add, a=1, b=2)
+        second = enqueue(add, a=3, b=4)
+        claimed = []
+
+        def worker():
+            claimed.extend(claim())
+            connection.close()
+
+        with transaction.atomic():
+            Job.objects.select_for_update().get(id=first.id)
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join(10)
+
+        self.assertEqual([job.id for job in claimed], [second.id])
@@ -0,0 +1,172 @@
+"""
+Tests for request metrics.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.metrics import (increment_counter, render_metrics)
+from core.models import (Recipe, Tag)
+
+
+METRICS_URL = reverse('metrics')
+TAGS_URL = reverse('recipe:tag-list')
+EXPORT_URL = reverse('recipe:recipe-export')
+
+
+def sample(name, route, method='GET', **labels):
+    """Return a sample of a metric for a route, or 0 if not recorded."""
+    labels.update({'route': route, 'method': method})
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTests(TestCase):
+    """Test requests are recorded and reported."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'test123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_records_route(self):
+        """Test a request is recorded under its route name."""
+        Tag.objects.create(user=self.user, name='Vegan')
+        route = 'recipe:tag-list'
+        count = sample('http_request_duration_seconds_count', route)
+        queries = sample('http_request_db_queries_sum', route)
+        size = sample('http_response_size_bytes_sum', route)
+        responses = sample('http_responses_total', route, status='200')
+
+        res = self.client.get(TAGS_URL)
+
+        self.assertEqual(
+            sample('http_request_duration_seconds_count', route),
+            count + 1,
+        )
+        self.assertGreater(
+            sample('http_request_db_queries_sum', route),
+            queries,
+        )
+        self.assertEqual(
+            sample('http_response_size_bytes_sum', route),
+            size + len(res.content),
+        )
+        self.assertEqual(
+            sample('http_responses_total', route, status='200'),
+            responses + 1,
+        )
+
+    def test_records_streamed_response(self):
+        """Test a streamed response is recorded once it is consumed."""
+        Recipe.objects.create(
+            user=self.user,
+            title='Sample recipe',
+            time_minutes=5,
+            price='5.00',
+        )
+        route = 'recipe:recipe-export'
+        count = sample('http_request_duration_seconds_count', route)
+        size = sample('http_response_size_bytes_sum', route)
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(
+            sample('http_request_duration_seconds_count', route),
+            count,
+        )
+        content = b''.join(res.streaming_content)
+        self.assertEqual(
+            sample('http_request_duration_seconds_count', route),
+            count + 1,
+        )
+        self.assertEqual(
+            sample('http_response_size_bytes_sum', route),
+            size + len(content),
+        )
+
+    def test_metrics_require_staff(self):
+        """Test only staff can read metrics."""
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_metrics(self):
+        """Test staff can read metrics in Prometheus text format."""
+        self.client.get(TAGS_URL)
+        admin = get_user_model().objects.create_superuser(
+            'admin@example.com',
+            'test123',
+        )
+        self.client.force_authenticate(admin)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        self.assertIn(
+            b'http_request_duration_seconds_count'
+            b'{method="GET",route="recipe:tag-list"}',
+            res.content,
+        )
+
+    def test_unknown_method_recorded_as_other(self):
+        """Test unknown request methods share one label value."""
+        route = 'recipe:tag-list'
+        count = sample('http_request_duration_seconds_count', route, 'other')
+
+        self.client.generic('BOGUS', TAGS_URL)
+
+        self.assertEqual(
+            sample('http_request_duration_seconds_count', route, 'other'),
+            count + 1,
+        )
+        self.assertEqual(
+            sample('http_request_duration_seconds_count', route, 'BOGUS'),
+            0,
+        )
+
+
+class MultiProcessMetricsTests(TestCase):
+    """Test metrics of several processes are merged."""
+
+    def test_merges_process_files(self):
+        """Test samples written by other processes are reported."""
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=directory)
+            for _ in range(2):
+                subprocess.run([sys.executable, '-c', (
+                    'from prometheus_client import Counter\n'
+                    "Counter('worker_jobs', 'Jobs.').inc()\n"
+                )], env=env, check=True)
+
+            with patch.dict(os.environ, PROMETHEUS_MULTIPROC_DIR=directory):
+                content, _ = render_metrics()
+
+        self.assertIn(b'worker_jobs_total 2.0', content)
+
+
+class CounterTests(TestCase):
+    """Test statistics counters kept in the cache."""
+
+    def test_increment_counter(self):
+        """Test counters start at zero and grow by the given delta."""
+        cache.delete('test:counter')
+
+        increment_counter('test:counter')
+        increment_counter('test:counter', 5)
+
+        self.assertEqual(cache.get('test:counter'), 6)
@@ -0,0 +1,172 @@
+"""
+Tests for the database connection pool.
+"""
+import threading
+
+import psycopg2
+from django.contrib.auth import get_user_model
+from django.db import (connection, connections)
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.db.pool import (ConnectionPool, PoolTimeout)
+
+
+POOL_STATS_URL = reverse('core:pool-stats')
+
+
+def connect():
+    """Open a raw connection to the test database."""
+    return psycopg2.connect(**connection.get_connection_params())
+
+
+class ConnectionPoolTests(TestCase):
+    """Test checking connections out of and into the pool."""
+
+    def make_pool(self, **options):
+        pool = ConnectionPool(**options)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_reuses_connections(self):
+        """Test a returned connection is handed out again."""
+        pool = self.make_pool()
+
+        conn = pool.getconn(connect)
+        pool.putconn(conn)
+
+        self.assertIs(pool.getconn(connect), conn)
+        stats = pool.stats()
+        self.assertEqual(stats['opened'], 1)
+        self.assertEqual(stats['checkouts'], 2)
+        self.assertEqual(stats['in_use'], 1)
+        pool.putconn(conn)
+
+    def test_max_size(self):
+        """Test checkouts time out once max_size connections are in use."""
+        pool = self.make_pool(max_size=1, timeout=0.05)
+        conn = pool.getconn(connect)
+
+        with self.assertRaises(PoolTimeout):
+            pool.getconn(connect)
+
+        self.assertEqual(pool.stats()['timeouts'], 1)
+        pool.putconn(conn)
+
+    def test_waits_for_returned_connection(self):
+        """Test a waiting checkout gets the next returned connection."""
+        pool = self.make_pool(max_size=1, timeout=5)
+        conn = pool.getconn(connect)
+        timer = threading.Timer(0.05, pool.putconn, [conn])
+        timer.start()
+
+        self.assertIs(pool.getconn(connect), conn)
+        timer.join()
+        pool.putconn(conn)
+
+    def test_health_check_replaces_dead_connection(self):
+        """Test a connection killed while idle is replaced on checkout."""
+        pool = self.make_pool(check_after=0)
+        conn = pool.getconn(connect)
+        pool.putconn(conn)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_terminate_backend(%s)',
+                [conn.get_backend_pid()],
+            )
+
+        fresh = pool.getconn(connect)
+
+        self.assertIsNot(fresh, conn)
+        self.assertEqual(pool.stats()['failed_checks'], 1)
+        self.assertEqual(pool.stats()['size'], 1)
+        pool.putconn(fresh)
+
+    def test_evicts_idle_connections(self):
+        """Test connections idle for longer than max_idle are closed."""
+        pool = self.make_pool(max_idle=0)
+        conn = pool.getconn(connect)
+        pool.putconn(conn)
+
+        fresh = pool.getconn(connect)
+
+        self.assertIsNot(fresh, conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()['evicted'], 1)
+        pool.putconn(fresh)
+
+    def test_max_lifetime(self):
+        """Test connections older than max_lifetime are not reused."""
+        pool = self.make_pool(max_lifetime=0)
+        conn = pool.getconn(connect)
+        pool.putconn(conn)
+
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()['size'], 0)
+
+    def test_returned_connection_is_reset(self):
+        """Test open transactions and holdable cursors are closed."""
+        pool = self.make_pool()
+        conn = pool.getconn(connect)
+        cursor = conn.cursor('held', withhold=True)
+        cursor.execute('SELECT 1')
+        conn.commit()
+        conn.cursor().execute('SELECT 1')
+
+        pool.putconn(conn, reset=True)
+
+        self.assertEqual(
+            conn.get_transaction_status(),
+            psycopg2.extensions.TRANSACTION_STATUS_IDLE,
+        )
+        with conn.cursor() as check:
+            check.execute('SELECT name FROM pg_cursors')
+            self.assertEqual(check.fetchall(), [])
+        conn.rollback()
+
+    def test_backend_returns_connections_to_pool(self):
+        """Test the database backend reuses closed connections."""
+        wrapper = connections.create_connection('default')
+        wrapper.ensure_connection()
+        conn = wrapper.connection
+
+        wrapper.close()
+        wrapper.ensure_connection()
+
+        self.assertIs(wrapper.connection, conn)
+        wrapper.close()
+
+
+class PoolStatsApiTests(TestCase):
+    """Test the connection pool statistics API."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_stats_require_staff(self):
+        """Test only staff can read pool statistics."""
+        user = get_user_model().objects.create_user(
+            'user@example.com',
+            'test123',
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.get(POOL_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_stats(self):
+        """Test staff can read the pool's size and counters."""
+        admin = get_user_model().objects.create_superuser(
+            'admin@example.com',
+            'test123',
+        )
+        self.client.force_authenticate(admin)
+
+        res = self.client.get(POOL_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertGreaterEqual(res.data['in_use'], 1)
+        self.assertEqual(res.data['max_size'], 10)
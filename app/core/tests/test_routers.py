@@ -0,0 +1,230 @@
+"""
+Tests for routing reads to replica databases.
+"""
+import time
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from django.http import (HttpResponse, StreamingHttpResponse)
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from rest_framework.authtoken.models import Token
+
+from core.checks import check_replica_pinning
+from core.db.middleware import ReplicaPinningMiddleware
+from core.db.routers import (
+    ReplicaRouter,
+    pin_user,
+    read_database,
+    read_pinned,
+)
+from core.models import Recipe
+from user.authentication import CachedTokenAuthentication
+
+
+def read_database_response(request):
+    """View responding with the database recipes are read from.
+
+    Like token authentication, it reads from the primary if the user
+    is pinned.
+    """
+    user = getattr(request, 'user', None)
+    if user:
+        read_pinned(user.id)
+    return HttpResponse(router.db_for_read(Recipe))
+
+
+class User:
+    """Stand-in for an authenticated user."""
+    is_authenticated = True
+
+    def __init__(self, user_id):
+        self.id = user_id
+
+
+@override_settings(REPLICA_DATABASES=['replica_0'], REPLICA_PIN_SECONDS=5)
+class ReplicaRoutingTests(SimpleTestCase):
+    """Test reads are routed to replicas unless pinned to the primary."""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.middleware = ReplicaPinningMiddleware(read_database_response)
+
+    def read_database(self, method='get', user_id=1, **headers):
+        request = getattr(self.factory, method)('/', **headers)
+        if user_id:
+            request.user = User(user_id)
+        return self.middleware(request).content.decode()
+
+    def test_safe_requests_read_from_replica(self):
+        """Test reads while serving a GET go to a replica."""
+        self.assertEqual(self.read_database(), 'replica_0')
+        self.assertEqual(self.read_database(user_id=None), 'replica_0')
+
+    def test_writes_read_from_primary(self):
+        """Test reads while serving a write go to the primary."""
+        self.assertEqual(self.read_database('post'), 'default')
+        self.assertEqual(self.read_database('patch'), 'default')
+
+    def test_reads_pinned_after_write(self):
+        """Test users read from the primary for a while after writing."""
+        self.read_database('post', user_id=1)
+
+        self.assertEqual(self.read_database(user_id=1), 'default')
+        self.assertEqual(self.read_database(user_id=2), 'replica_0')
+
+    def test_reads_pinned_after_job_write(self):
+        """Test users whose data changed outside a request are pinned."""
+        pin_user(1)
+
+        self.assertEqual(self.read_database(user_id=1), 'default')
+        self.assertEqual(self.read_database(user_id=2), 'replica_0')
+
+    def test_session_users_pinned(self):
+        """Test users logged in with a session are pinned before views."""
+        pin_user(1)
+        middleware = ReplicaPinningMiddleware(
+            lambda request: HttpResponse(router.db_for_read(Recipe)),
+        )
+        request = self.factory.get('/')
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = 'session'
+        request.user = User(1)
+
+        response = middleware(request)
+
+        self.assertEqual(response.content, b'default')
+
+    @override_settings(REPLICA_PIN_SECONDS=0.001)
+    def test_pin_expires(self):
+        """Test users read from replicas again once the pin expires."""
+        self.read_database('post', user_id=1)
+        time.sleep(0.01)
+
+        self.assertEqual(self.read_database(user_id=1), 'replica_0')
+
+    def test_streaming_reads_from_replica(self):
+        """Test streamed content is read from the request's database."""
+        middleware = ReplicaPinningMiddleware(
+            lambda request: StreamingHttpResponse(
+                router.db_for_read(Recipe) for _ in range(2)
+            ),
+        )
+
+        response = middleware(self.factory.get('/'))
+
+        self.assertEqual(
+            b''.join(response.streaming_content),
+            b'replica_0replica_0',
+        )
+
+    def test_streaming_reads_pinned(self):
+        """Test streamed content of a pinned user is read from primary."""
+        def view(request):
+            read_pinned(request.user.id)
+            return StreamingHttpResponse(
+                router.db_for_read(Recipe) for _ in range(2)
+            )
+
+        pin_user(1)
+        request = self.factory.get('/')
+        request.user = User(1)
+        response = ReplicaPinningMiddleware(view)(request)
+
+        self.assertEqual(
+            b''.join(response.streaming_content),
+            b'defaultdefault',
+        )
+
+    def test_async_requests(self):
+        """Test reads are routed while serving async views."""
+        async def view(request):
+            return read_database_response(request)
+
+        middleware = ReplicaPinningMiddleware(view)
+        response = async_to_sync(middleware)(self.factory.get('/'))
+        write = async_to_sync(middleware)(self.factory.post('/'))
+
+        self.assertEqual(response.content, b'replica_0')
+        self.assertEqual(write.content, b'default')
+
+    def test_reads_outside_requests_use_primary(self):
+        """Test jobs and commands read from the primary."""
+        self.assertEqual(router.db_for_read(Recipe), 'default')
+
+    def test_writes_and_migrations_use_primary(self):
+        """Test writes and migrations never go to replicas."""
+        replica_router = ReplicaRouter()
+
+        self.assertEqual(replica_router.db_for_write(Recipe), 'default')
+        self.assertFalse(replica_router.allow_migrate('replica_0', 'core'))
+        self.assertIsNone(replica_router.allow_migrate('default', 'core'))
+
+    @override_settings(REPLICA_DATABASES=[])
+    def test_no_replicas(self):
+        """Test all reads go to the primary without replicas."""
+        self.assertEqual(self.read_database(), 'default')
+
+    @override_settings(CACHE_SHARED=False)
+    def test_check_shared_cache(self):
+        """Test replicas are refused with a process-local cache."""
+        errors = check_replica_pinning(None)
+
+        self.assertEqual([error.id for error in errors], ['core.E001'])
+
+
+@override_settings(REPLICA_DATABASES=['replica_0'], REPLICA_PIN_SECONDS=5)
+class PinnedAuthenticationTests(TestCase):
+    """Test token authentication reads pinned users from the primary."""
+
+    def setUp(self):
+        cache.clear()
+        user = get_user_model().objects.create_user(
+            'user@example.com',
+            'test123',
+        )
+        self.token = Token.objects.create(user=user)
+        self.auth = CachedTokenAuthentication()
+
+    def authenticate(self):
+        """Authenticate during a replica read and return the read database."""
+        token = read_database.set('replica_0')
+        try:
+            self.auth.authenticate_credentials(self.token.key)
+            return router.db_for_read(Recipe)
+        finally:
+            read_database.reset(token)
+
+    def test_token_read_from_primary(self):
+        """Test tokens are looked up on the primary."""
+        databases = set()
+        db_for_read = ReplicaRouter.db_for_read
+
+        def spy(router, model, **hints):
+            database = db_for_read(router, model, **hints)
+            if model is Token:
+                databases.add(database)
+            return database
+
+        with patch.object(ReplicaRouter, 'db_for_read', spy):
+            self.authenticate()
+
+        self.assertEqual(databases, {'default'})
+
+    def test_unpinned_user_reads_from_replica(self):
+        """Test an unpinned user reads from the replica once authenticated."""
+        self.assertEqual(self.authenticate(), 'replica_0')
+
+    def test_pinned_user_reads_from_primary(self):
+        """Test a pinned user reads from the primary after authenticating."""
+        pin_user(self.token.user_id)
+
+        self.assertEqual(self.authenticate(), 'default')
@@ -0,0 +1,65 @@
+"""
+Tests for serving the OpenAPI schema.
+"""
+import json
+import tempfile
+from unittest.mock import patch
+
+from django.test import (SimpleTestCase, override_settings)
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import schema
+
+
+SCHEMA_URL = reverse('api-schema')
+
+
+@override_settings(API_SCHEMA_FILE='')
+class SchemaApiTests(SimpleTestCase):
+    """Test the schema is generated once and served with ETags."""
+
+    def setUp(self):
+        schema.clear_schema()
+        self.addCleanup(schema.clear_schema)
+        self.client = APIClient()
+
+    def test_schema_generated_once(self):
+        """Test repeated requests reuse the generated schema."""
+        with patch(
+            'core.schema.generate_schema',
+            wraps=schema.generate_schema,
+        ) as patched_generate:
+            self.client.get(SCHEMA_URL)
+            res = self.client.get(SCHEMA_URL, {'format': 'json'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('/api/recipe/recipes/', res.json()['paths'])
+        self.assertEqual(patched_generate.call_count, 1)
+
+    def test_conditional_request(self):
+        """Test a matching If-None-Match gets 304 Not Modified."""
+        res = self.client.get(SCHEMA_URL)
+        etag = res['ETag']
+
+        cached = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+        json_res = self.client.get(
+            SCHEMA_URL, {'format': 'json'}, HTTP_IF_NONE_MATCH=etag,
+        )
+
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached['ETag'], etag)
+        self.assertEqual(json_res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(json_res['ETag'], etag)
+
+    def test_schema_served_from_file(self):
+        """Test the schema is read from API_SCHEMA_FILE when it exists."""
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as schema_file:
+            json.dump({'openapi': '3.0.3', 'paths': {}}, schema_file)
+            schema_file.flush()
+
+            with override_settings(API_SCHEMA_FILE=schema_file.name):
+                res = self.client.get(SCHEMA_URL, {'format': 'json'})
+
+        self.assertEqual(res.json(), {'openapi': '3.0.3', 'paths': {}})
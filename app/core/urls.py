@@ -0,0 +1,13 @@
+"""
+URL mappings for the core app.
+"""
+from django.urls import path
+
+from core import views
+
+
+app_name = 'core'
+
+urlpatterns = [
+    path('pool-stats/', views.PoolStatsView.as_view(), name='pool-stats'),
+]
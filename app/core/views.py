@@ -0,0 +1,79 @@
+"""
+Views for core APIs
+"""
+from django.db import connection
+from django.http import HttpResponse
+from django.utils.http import parse_etags
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework import (permissions, status)
+from rest_framework.renderers import BaseRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.metrics import render_metrics
+from core.schema import render_schema
+from core.serializers import PoolStatsSerializer
+from user.authentication import CachedTokenAuthentication
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Renderer passing through metrics in Prometheus text format."""
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict) and 'detail' in data:
+            return str(data['detail']).encode(self.charset)
+
+        return data
+
+
+class PoolStatsView(APIView):
+    """Report the connection pool of the process serving the request."""
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(responses=PoolStatsSerializer)
+    def get(self, request):
+        connection.ensure_connection()
+        serializer = PoolStatsSerializer(connection.pool.stats())
+        return Response(serializer.data)
+
+
+class SchemaView(SpectacularAPIView):
+    """Serve the OpenAPI schema rendered once per process, with an ETag."""
+
+    def _get_schema_response(self, request):
+        if request.GET.get('lang'):
+            return super()._get_schema_response(request)
+
+        renderer = request.accepted_renderer
+        content, etag = render_schema(renderer, request.accepted_media_type)
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED,
+                headers={'ETag': etag},
+            )
+
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f'{content_type}; charset={renderer.charset}'
+        response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        return response
+
+
+class MetricsView(APIView):
+    """Report per-route request metrics in Prometheus text format.
+
+    Scrape with a staff user's token, as an authorization of type Token.
+    """
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+    renderer_classes = [PrometheusRenderer]
+
+    @extend_schema(responses={(200, 'text/plain'): str})
+    def get(self, request):
+        content, content_type = render_metrics()
+        return Response(content, content_type=content_type)
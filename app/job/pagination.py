@@ -0,0 +1,9 @@
+"""
+Pagination for the job APIs.
+"""
+from core.pagination import ApiCursorPagination
+
+
+class JobCursorPagination(ApiCursorPagination):
+    """Keyset pagination for jobs, newest first."""
+    ordering = '-id'
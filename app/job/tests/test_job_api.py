@@ -0,0 +1,113 @@
+"""
+Tests for the job API.
+"""
+from django.contrib.auth import get_user_model
+from django.test import (TestCase, override_settings)
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.jobs import enqueue
+from core.models import Job
+from core.tests.test_jobs import add
+
+
+JOBS_URL = reverse('job:job-list')
+
+
+def detail_url(job_id):
+    """Create and return a job detail URL."""
+    return reverse('job:job-detail', args=[job_id])
+
+
+def create_user(**params):
+    """Create and return a user"""
+    return get_user_model().objects.create_user(**params)
+
+
+class PublicJobApiTests(TestCase):
+    """Test unauthenticated API requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test auth is required to view jobs."""
+        res = self.client.get(JOBS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateJobApiTests(TestCase):
+    """Test authenticated API requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='test123')
+        self.client.force_authenticate(self.user)
+
+    def test_list_limited_to_user(self):
+        """Test only the user's own jobs are listed."""
+        other_user = create_user(email='other@example.com', password='test')
+        enqueue(add, user_id=other_user.id, a=1, b=2)
+        job = enqueue(add, user_id=self.user.id, a=1, b=2)
+
+        res = self.client.get(JOBS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['id'] for item in res.data['results']],
+            [job.id],
+        )
+
+    @override_settings(API_PAGE_SIZE=1)
+    def test_default_page_size_setting(self):
+        """Test jobs are paged by the API_PAGE_SIZE setting."""
+        enqueue(add, user_id=self.user.id, a=1, b=2)
+        job = enqueue(add, user_id=self.user.id, a=1, b=2)
+
+        res = self.client.get(JOBS_URL)
+
+        self.assertEqual(
+            [item['id'] for item in res.data['results']],
+            [job.id],
+        )
+        self.assertIsNotNone(res.data['next'])
+
+    def test_filter_by_status(self):
+        """Test filtering jobs by status."""
+        enqueue(add, user_id=self.user.id, a=1, b=2)
+        done = enqueue(add, user_id=self.user.id, a=1, b=2)
+        Job.objects.filter(id=done.id).update(status=Job.SUCCEEDED)
+
+        res = self.client.get(JOBS_URL, {'status': Job.SUCCEEDED})
+
+        self.assertEqual(
+            [item['id'] for item in res.data['results']],
+            [done.id],
+        )
+
+    def test_retrieve_job(self):
+        """Test retrieving a job's status and result."""
+        job = enqueue(add, user_id=self.user.id, a=1, b=2)
+        Job.objects.filter(id=job.id).update(
+            status=Job.SUCCEEDED,
+            result=3,
+        )
+
+        res = self.client.get(detail_url(job.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['status'], Job.SUCCEEDED)
+        self.assertEqual(res.data['result'], 3)
+        self.assertNotIn('payload', res.data)
+
+    def test_other_users_job_not_found(self):
+        """Test another user's job cannot be retrieved."""
+        other_user = create_user(email='other@example.com', password='test')
+        job = enqueue(add, user_id=other_user.id, a=1, b=2)
+
+        res = self.client.get(detail_url(job.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,48 @@
+"""
+Views for the job APIs
+"""
+from drf_spectacular.utils import (
+    extend_schema_view,
+    extend_schema,
+    OpenApiParameter,
+    OpenApiTypes,
+)
+from rest_framework import (mixins, viewsets)
+from rest_framework.permissions import IsAuthenticated
+
+from core.models import Job
+from job.pagination import JobCursorPagination
+from job.serializers import JobSerializer
+from user.authentication import CachedTokenAuthentication
+
+
+@extend_schema_view(
+    list=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'status',
+                OpenApiTypes.STR,
+                enum=[choice for choice, label in Job.STATUS_CHOICES],
+                description='Only return jobs with this status.',
+            ),
+        ]
+    )
+)
+class JobViewSet(mixins.ListModelMixin,
+                 mixins.RetrieveModelMixin,
+                 viewsets.GenericViewSet):
+    """View the status of the authenticated user's background jobs."""
+    serializer_class = JobSerializer
+    queryset = Job.objects.all()
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    pagination_class = JobCursorPagination
+
+    def get_queryset(self):
+        """Filter jobs to the authenticated user."""
+        queryset = self.queryset.filter(user=self.request.user)
+        status = self.request.query_params.get('status')
+        if status:
+            queryset = queryset.filter(status=status)
+
+        return queryset.order_by('-id')
@@ -0,0 +1,110 @@
+"""
+Per-user response caching for the recipe APIs.
+
+Responses are cached under the user's data version, which every write
+replaces. Versions are kept in the default cache, so caching is only
+enabled when all processes share it, as set by CACHE_SHARED; otherwise
+a write by the job worker or another web process would go unseen.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.db.routers import pin_user
+from core.metrics import increment_counter
+
+
+VERSION_KEY = 'recipe:version:{user_id}'
+RESPONSE_KEY = 'recipe:response:{user_id}:{version}:{digest}'
+STATS_KEY = 'recipe:stats:{name}'
+VERSION_TIMEOUT = 24 * 60 * 60
+
+
+def caching_enabled():
+    """Return whether responses may be cached."""
+    return settings.CACHE_SHARED
+
+
+def _new_version(user_id):
+    """Store and return a new data version for the user."""
+    version = uuid.uuid4().hex
+    cache.set(VERSION_KEY.format(user_id=user_id), version, VERSION_TIMEOUT)
+    return version
+
+
+def get_data_version(user_id):
+    """Return the current data version for the user."""
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, VERSION_TIMEOUT)
+        version = cache.get(key)
+
+    return version
+
+
+def _changed(user_id):
+    """Replace the user's data version and pin their reads."""
+    _new_version(user_id)
+    pin_user(user_id)
+
+
+def bump_data_version(user_id):
+    """Invalidate cached responses for the user, now and on commit.
+
+    The user's reads are pinned to the primary too, so writes made by
+    jobs are seen at once by every process.
+    """
+    _changed(user_id)
+    transaction.on_commit(lambda: _changed(user_id))
+
+
+def response_cache_key(request, prefix=''):
+    """Return the cache key for a request at the user's data version."""
+    user_id = request.user.id
+    digest = hashlib.sha256(
+        f'{prefix}:{request.build_absolute_uri()}'.encode()
+    ).hexdigest()
+
+    return RESPONSE_KEY.format(
+        user_id=user_id,
+        version=get_data_version(user_id),
+        digest=digest,
+    )
+
+
+def response_etag(request, uri=None):
+    """Return a strong ETag for a request at the user's data version."""
+    user_id = request.user.id
+    uri = uri or request.build_absolute_uri()
+    media_type = getattr(request, 'accepted_media_type', '')
+    digest = hashlib.sha256(
+        f'{user_id}:{get_data_version(user_id)}:{media_type}:{uri}'.encode()
+    ).hexdigest()
+
+    return f'"{digest[:32]}"'
+
+
+def get_response(key):
+    """Return cached response data and count the hit or miss."""
+    data = cache.get(key)
+    increment_counter(
+        STATS_KEY.format(name='hits' if data is not None else 'misses'),
+    )
+    return data
+
+
+def set_response(key, data):
+    """Cache response data for the configured timeout."""
+    cache.set(key, data, settings.RECIPE_RESPONSE_CACHE_TIMEOUT)
+
+
+def get_stats():
+    """Return the response cache hit and miss counters."""
+    return {
+        name: cache.get(STATS_KEY.format(name=name), 0)
+        for name in ('hits', 'misses')
+    }
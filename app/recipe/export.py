@@ -0,0 +1,46 @@
+"""
+Streaming NDJSON export of recipes.
+"""
+import json
+from itertools import islice
+
+from django.conf import settings
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from recipe.fastpath import ValuesSerializer
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Renderer for newline delimited JSON."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render data, such as an error response, as a single line."""
+        if data is None:
+            return b''
+
+        return f'{json.dumps(data, cls=JSONEncoder)}\n'.encode()
+
+
+def export_lines(queryset, serializer, chunk_size=None):
+    """Yield serialized recipes as NDJSON, one chunk of rows at a time.
+
+    Rows are read through a server-side cursor and nested fields are
+    fetched per chunk, so memory use does not grow with the queryset.
+    """
+    chunk_size = chunk_size or settings.RECIPE_EXPORT_CHUNK_SIZE
+    values = ValuesSerializer(serializer)
+    rows = values.values(queryset).iterator(chunk_size=chunk_size)
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        yield ''.join(
+            f'{json.dumps(item, cls=JSONEncoder)}\n'
+            for item in values.to_representation(chunk)
+        )
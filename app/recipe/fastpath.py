@@ -0,0 +1,95 @@
+"""
+Fast read-only serialization for the recipe APIs.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+
+
+class ValuesSerializer:
+    """Build a serializer's output from .values() rows.
+
+    Produces the same data as the wrapped serializer without creating a
+    model instance or serializer field per row. Nested many-to-many
+    serializers are filled in with one grouped query per relation.
+    """
+
+    def __init__(self, serializer):
+        self.model = serializer.Meta.model
+        self.pk_name = self.model._meta.pk.attname
+        self.fields = []
+        self.nested_fields = {}
+        for name, field in serializer.fields.items():
+            if isinstance(field, serializers.ListSerializer):
+                self.fields.append((name, field.source, None))
+                self.nested_fields[field.source] = [
+                    child.source for child in field.child.fields.values()
+                ]
+            else:
+                self.fields.append(
+                    (name, field.source, self._converter(field))
+                )
+
+    def _converter(self, field):
+        """Return a function converting a column value for output."""
+        try:
+            model_field = self.model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return field.to_representation
+
+        if isinstance(model_field, models.FileField):
+            def convert(value):
+                return field.to_representation(
+                    model_field.attr_class(None, model_field, value)
+                )
+            return convert
+
+        return field.to_representation
+
+    def values(self, queryset, *extra):
+        """Return the queryset as rows holding the needed columns."""
+        columns = {self.pk_name, *extra}
+        columns.update(
+            source for name, source, convert in self.fields if convert
+        )
+        return queryset.prefetch_related(None).values(*columns)
+
+    def _nested(self, source, ids):
+        """Return nested items for each parent ID from one query."""
+        field = self.model._meta.get_field(source)
+        through = field.remote_field.through
+        parent = field.m2m_field_name()
+        child = field.m2m_reverse_field_name()
+        names = self.nested_fields[source]
+
+        rows = through.objects\
+            .filter(**{f'{parent}__in': ids})\
+            .order_by(f'{child}_id')\
+            .values_list(f'{parent}_id', *[f'{child}__{n}' for n in names])
+
+        nested = {}
+        for parent_id, *values in rows:
+            nested.setdefault(parent_id, []).append(dict(zip(names, values)))
+        return nested
+
+    def to_representation(self, rows):
+        """Return serialized data for the rows."""
+        ids = [row[self.pk_name] for row in rows]
+        nested = {
+            source: self._nested(source, ids)
+            for name, source, convert in self.fields if not convert
+        }
+
+        data = []
+        for row in rows:
+            item = {}
+            for name, source, convert in self.fields:
+                if not convert:
+                    item[name] = nested[source].get(row[self.pk_name], [])
+                elif row[source] is None:
+                    item[name] = None
+                else:
+                    item[name] = convert(row[source])
+            data.append(item)
+
+        return data
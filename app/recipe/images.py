@@ -0,0 +1,59 @@
+"""
+Background rendering and reference counting of recipe images.
+"""
+from django.db import transaction
+
+from core.jobs import enqueue
+from core.models import Recipe
+from core.storage import lock_content
+from recipe.cache import bump_data_version
+from recipe.variants import render_variants
+
+
+def save_variants(recipe_id, name, variants):
+    """Store variant names on the recipe if its image is unchanged."""
+    recipe = Recipe.objects.filter(id=recipe_id, image=name)
+    user_ids = list(recipe.values_list('user_id', flat=True))
+    if recipe.update(image_variants=variants):
+        bump_data_version(user_ids[0])
+
+
+def release_image(name, variants):
+    """Delete an image and its variants once no recipe uses them.
+
+    The image's digest is locked first, so a concurrent upload of the
+    same content either commits its reference before the check or saves
+    the file again after the delete.
+    """
+    if not name:
+        return
+
+    with transaction.atomic():
+        lock_content(name)
+        if Recipe.objects.filter(image=name).exists():
+            return
+
+        storage = Recipe._meta.get_field('image').storage
+        for stored_name in [name, *variants.values()]:
+            storage.delete(stored_name)
+
+
+def render_image_variants(recipe_id, name):
+    """Job rendering and saving the variants of a recipe's image."""
+    if not Recipe.objects.filter(id=recipe_id, image=name).exists():
+        return None
+
+    storage = Recipe._meta.get_field('image').storage
+    variants = render_variants(storage.location, name)
+    save_variants(recipe_id, name, variants)
+    return variants
+
+
+def schedule_variants(recipe):
+    """Queue rendering the variants of a recipe's image."""
+    return enqueue(
+        render_image_variants,
+        user_id=recipe.user_id,
+        recipe_id=recipe.id,
+        name=recipe.image.name,
+    )
@@ -0,0 +1,176 @@
+"""
+Bulk import of recipes from NDJSON or CSV files.
+
+Records are validated and inserted a batch at a time: each batch is one
+multi-row INSERT for the recipes, one lookup-or-insert per attribute type
+and one COPY per relation. The import's checkpoint is advanced in the
+same transaction, so an interrupted import resumes after the last
+committed batch without duplicating recipes. Running as a job, an import
+renews its claim before every batch.
+"""
+import csv
+import io
+import json
+import os
+from itertools import islice
+
+from django.conf import settings
+from django.db import (connection, transaction)
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from core.jobs import (JobSuperseded, touch)
+from core.models import (Recipe, RecipeImport, Tag, Ingredient)
+from recipe.cache import bump_data_version
+from recipe.serializers import (
+    RecipeBulkCreateSerializer,
+    get_or_create_attributes,
+)
+
+
+MAX_ERRORS = 100
+RELATIONS = [(Tag, 'tags'), (Ingredient, 'ingredients')]
+
+
+class ImportInterrupted(JobSuperseded):
+    """Raised when another worker has taken over an import."""
+
+
+def read_records(path, skip=0):
+    """Yield the records of an NDJSON or CSV file, after the first skip.
+
+    CSV files hold tag and ingredient names separated by "|". Lines of an
+    NDJSON file that are not valid JSON are yielded as None.
+    """
+    with open(path, newline='') as source:
+        if path.lower().endswith('.csv'):
+            for row in islice(csv.DictReader(source), skip, None):
+                for field in ('tags', 'ingredients'):
+                    names = (row.get(field) or '').split('|')
+                    row[field] = [
+                        {'name': name.strip()}
+                        for name in names if name.strip()
+                    ]
+                yield row
+            return
+
+        lines = (line for line in source if line.strip())
+        for line in islice(lines, skip, None):
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+
+def copy_rows(model, columns, rows):
+    """Insert rows of integers with COPY, without building model instances."""
+    data = io.StringIO(
+        ''.join('\t'.join(map(str, row)) + '\n' for row in rows)
+    )
+    with connection.cursor() as cursor:
+        cursor.copy_from(data, model._meta.db_table, columns=columns)
+
+
+def import_batch(user, records, start=0):
+    """Validate and insert a batch of records.
+
+    Invalid records are skipped. Returns the number of recipes created and
+    the errors of the skipped records, numbered from start.
+    """
+    serializer = RecipeBulkCreateSerializer()
+    items, errors = [], []
+    for index, record in enumerate(records, start):
+        try:
+            if record is None:
+                raise ValidationError('Invalid JSON.')
+            items.append(serializer.run_validation(record))
+        except ValidationError as exc:
+            errors.append({'record': index, 'errors': exc.detail})
+
+    created = Recipe.objects.bulk_create([
+        Recipe(user=user, **{
+            key: value for key, value in item.items()
+            if key not in ('tags', 'ingredients')
+        })
+        for item in items
+    ])
+    for model, field in RELATIONS:
+        found = get_or_create_attributes(
+            model,
+            user,
+            [value for item in items for value in item.get(field, [])],
+        )
+        copy_rows(
+            getattr(Recipe, field).through,
+            ['recipe_id', f'{model._meta.model_name}_id'],
+            [
+                (recipe.id, found[name].id)
+                for recipe, item in zip(created, items)
+                for name in dict.fromkeys(
+                    value['name'] for value in item.get(field, [])
+                )
+            ],
+        )
+
+    return len(created), errors
+
+
+def run_import(import_id, batch_size=None, delete_source=False, report=None):
+    """Job running an import from its checkpoint to the end of its file.
+
+    report, if given, is called with the import after every batch.
+    """
+    batch_size = batch_size or settings.RECIPE_IMPORT_BATCH_SIZE
+    recipe_import = RecipeImport.objects\
+        .select_related('user')\
+        .get(id=import_id)
+    records = read_records(recipe_import.source, recipe_import.processed)
+
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            break
+        if not touch():
+            raise ImportInterrupted(
+                f'Import {import_id} was claimed by another worker.'
+            )
+
+        with transaction.atomic():
+            checkpoint = RecipeImport.objects\
+                .select_for_update()\
+                .values_list('processed', flat=True)\
+                .get(id=import_id)
+            if checkpoint != recipe_import.processed:
+                raise ImportInterrupted(
+                    f'Import {import_id} was resumed elsewhere.'
+                )
+
+            created, errors = import_batch(
+                recipe_import.user,
+                batch,
+                recipe_import.processed,
+            )
+            recipe_import.processed += len(batch)
+            recipe_import.created += created
+            recipe_import.failed += len(errors)
+            if errors and len(recipe_import.errors) < MAX_ERRORS:
+                recipe_import.errors = \
+                    (recipe_import.errors + errors)[:MAX_ERRORS]
+            recipe_import.save(update_fields=[
+                'processed', 'created', 'failed', 'errors',
+            ])
+            bump_data_version(recipe_import.user_id)
+
+        if report:
+            report(recipe_import)
+
+    recipe_import.finished_at = timezone.now()
+    recipe_import.save(update_fields=['finished_at'])
+    if delete_source:
+        os.remove(recipe_import.source)
+
+    return {
+        'processed': recipe_import.processed,
+        'created': recipe_import.created,
+        'failed': recipe_import.failed,
+    }
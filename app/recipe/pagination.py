@@ -0,0 +1,21 @@
+"""
+Pagination for the recipe APIs.
+"""
+from core.pagination import ApiCursorPagination
+
+
+class RecipeCursorPagination(ApiCursorPagination):
+    """Keyset pagination for recipes, newest first."""
+    ordering = '-id'
+
+    def get_ordering(self, request, queryset, view):
+        """Order ranked search results by relevance."""
+        if 'search_rank' in queryset.query.annotations:
+            return ('-search_rank', '-id')
+
+        return super().get_ordering(request, queryset, view)
+
+
+class RecipeAttributeCursorPagination(RecipeCursorPagination):
+    """Keyset pagination for tags and ingredients, ordered by name."""
+    ordering = ('-name', '-id')
@@ -1,8 +1,76 @@
 """
 Serializers for recipe APIs
 """
+import os
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
-from core.models import (Recipe, Tag, Ingredient)
+from core.models import (Recipe, RecipeImport, Tag, Ingredient)
+from recipe.cache import bump_data_version
+
+
+def get_or_create_attributes(model, user, items):
+    """Return attributes for the items keyed by name, creating in bulk."""
+    names = list(dict.fromkeys(item['name'] for item in items))
+    if not names:
+        return {}
+
+    found = {}
+    for obj in model.objects.filter(user=user, name__in=names):
+        found.setdefault(obj.name, obj)
+
+    missing = [
+        model(user=user, name=name)
+        for name in names if name not in found
+    ]
+    for obj in model.objects.bulk_create(missing):
+        found[obj.name] = obj
+
+    return {name: found[name] for name in names}
+
+
+def _field_names(request, param, fields):
+    """Return the field names listed in a query parameter."""
+    names = set(filter(None, request.query_params.get(param, '').split(',')))
+    unknown = names.difference(fields)
+    if unknown:
+        raise serializers.ValidationError({param: (
+            f'Unknown fields: {", ".join(sorted(unknown))}. '
+            f'Allowed fields: {", ".join(fields)}.'
+        )})
+
+    return names
+
+
+def sparse_fields(request, fields):
+    """Return the fields selected by the ?fields= and ?omit= parameters."""
+    if request is None or request.method != 'GET':
+        return list(fields)
+
+    selected = _field_names(request, 'fields', fields)
+    omitted = _field_names(request, 'omit', fields)
+    if selected:
+        fields = [name for name in fields if name in selected]
+    if omitted:
+        fields = [name for name in fields if name not in omitted]
+
+    return list(fields)
+
+
+class SparseFieldsMixin:
+    """Drop fields not selected by the ?fields= and ?omit= parameters."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        selected = set(sparse_fields(request, self.fields))
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
 
 
 class IngredientSerializer(serializers.ModelSerializer):
@@ -23,7 +91,23 @@ class TagSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class IngredientCountSerializer(IngredientSerializer):
+    """Serializer for ingredients with the number of recipes using them"""
+    recipe_count = serializers.IntegerField(read_only=True)
+
+    class Meta(IngredientSerializer.Meta):
+        fields = IngredientSerializer.Meta.fields + ['recipe_count']
+
+
+class TagCountSerializer(TagSerializer):
+    """Serializer for tags with the number of recipes using them"""
+    recipe_count = serializers.IntegerField(read_only=True)
+
+    class Meta(TagSerializer.Meta):
+        fields = TagSerializer.Meta.fields + ['recipe_count']
+
+
+class RecipeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for recipes."""
     tags = TagSerializer(many=True, required=False)
     ingredients = IngredientSerializer(many=True, required=False)
@@ -37,24 +121,16 @@ class RecipeSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
     def _get_or_create_tags(self, tags, recipe):
+        """Handle getting or creating tags as needed."""
         auth_user = self.context['request'].user
-        for tag in tags:
-            tag_obj, created = Tag.objects.get_or_create(
-                user=auth_user,
-                **tag
-            )
-            recipe.tags.add(tag_obj)
+        found = get_or_create_attributes(Tag, auth_user, tags)
+        recipe.tags.add(*found.values())
 
     def _get_or_create_ingredients(self, ingredients, recipe):
         """Handle getting or creating ingredients as needed."""
         auth_user = self.context['request'].user
-        for ingredient in ingredients:
-            ingredient_obj, created = Ingredient.objects.get_or_create(
-                user=auth_user,
-                **ingredient,
-            )
-
-            recipe.ingredients.add(ingredient_obj)
+        found = get_or_create_attributes(Ingredient, auth_user, ingredients)
+        recipe.ingredients.add(*found.values())
 
     def create(self, validated_data):
         """Create Recipe"""
@@ -64,6 +140,7 @@ class RecipeSerializer(serializers.ModelSerializer):
         recipe = Recipe.objects.create(**validated_data)
         self._get_or_create_tags(tags, recipe)
         self._get_or_create_ingredients(ingredients, recipe)
+        bump_data_version(recipe.user_id)
 
         return recipe
 
@@ -87,18 +164,261 @@ class RecipeSerializer(serializers.ModelSerializer):
         return instance
 
 
+@extend_schema_field({
+    'type': 'object',
+    'additionalProperties': {'type': 'string', 'format': 'uri'},
+})
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Field for image variant URLs keyed by variant name"""
+
+    def to_representation(self, value):
+        request = self.context.get('request')
+        storage = Recipe._meta.get_field('image').storage
+        urls = {}
+        for name, path in value.items():
+            url = storage.url(path)
+            urls[name] = request.build_absolute_uri(url) if request else url
+
+        return urls
+
+
 class RecipeDetailSerializer(RecipeSerializer):
     """Serializer for recipe detail"""
+    image_variants = ImageVariantsField()
 
     class Meta(RecipeSerializer.Meta):
-        fields = RecipeSerializer.Meta.fields + ['description', 'image']
+        fields = RecipeSerializer.Meta.fields + [
+            'description',
+            'image',
+            'image_variants',
+        ]
 
 
 class RecipeImageSerializer(serializers.ModelSerializer):
     """Serializer for recipe image"""
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Recipe
-        fields = ['id', 'image']
+        fields = ['id', 'image', 'image_variants']
         read_only_fields = ['id']
         extra_kwarg = {'image': {'required': 'True'}}
+
+
+class RecipeBulkCreateSerializer(RecipeSerializer):
+    """Serializer for recipes created in bulk"""
+
+    class Meta(RecipeSerializer.Meta):
+        fields = RecipeSerializer.Meta.fields + ['description']
+        extra_kwargs = {'price': {'required': True}}
+
+
+class RecipeBulkUpdateSerializer(RecipeBulkCreateSerializer):
+    """Serializer for recipes updated in bulk"""
+    id = serializers.IntegerField()
+
+    class Meta(RecipeBulkCreateSerializer.Meta):
+        read_only_fields = []
+        extra_kwargs = {
+            'title': {'required': False},
+            'time_minutes': {'required': False},
+        }
+
+
+class RecipeBulkSerializer(serializers.Serializer):
+    """Serializer for creating, updating and deleting recipes in bulk"""
+    max_items = 1000
+
+    def get_fields(self):
+        """Declare the batch fields here as they share names with methods."""
+        return {
+            'create': RecipeBulkCreateSerializer(many=True, required=False),
+            'update': RecipeBulkUpdateSerializer(many=True, required=False),
+            'delete': serializers.ListField(
+                child=serializers.IntegerField(),
+                required=False,
+            ),
+        }
+
+    def _validate_ids(self, ids):
+        """Return per-item errors for IDs not owned by the user."""
+        auth_user = self.context['request'].user
+        owned = set(
+            Recipe.objects
+            .filter(user=auth_user, id__in=ids)
+            .values_list('id', flat=True)
+        )
+        seen = set()
+        errors = []
+        for recipe_id in ids:
+            if recipe_id not in owned:
+                errors.append({'id': ['Recipe not found.']})
+            elif recipe_id in seen:
+                errors.append({'id': ['Duplicate recipe.']})
+            else:
+                errors.append({})
+            seen.add(recipe_id)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+    def validate_update(self, value):
+        """Validate updated recipes exist and belong to the user."""
+        self._validate_ids([item['id'] for item in value])
+        return value
+
+    def validate_delete(self, value):
+        """Validate deleted recipes exist and belong to the user."""
+        self._validate_ids(value)
+        return value
+
+    def validate(self, attrs):
+        """Validate the batch size and that no recipe is used twice."""
+        items = sum(len(attrs.get(key, [])) for key in self.fields)
+        if items > self.max_items:
+            raise serializers.ValidationError(
+                f'A batch can contain at most {self.max_items} items.'
+            )
+
+        updated = {item['id'] for item in attrs.get('update', [])}
+        if updated & set(attrs.get('delete', [])):
+            raise serializers.ValidationError(
+                'A recipe cannot be updated and deleted in the same batch.'
+            )
+
+        return attrs
+
+    def _set_attributes(self, model, field, items):
+        """Replace a relation on many recipes at once."""
+        if not items:
+            return
+
+        auth_user = self.context['request'].user
+        through = getattr(Recipe, field).through
+        fk_name = f'{model._meta.model_name}_id'
+
+        found = get_or_create_attributes(
+            model,
+            auth_user,
+            [item for recipe, values in items for item in values],
+        )
+        through.objects.filter(
+            recipe_id__in=[recipe.id for recipe, values in items],
+        ).delete()
+        through.objects.bulk_create([
+            through(recipe_id=recipe.id, **{fk_name: found[name].id})
+            for recipe, values in items
+            for name in dict.fromkeys(item['name'] for item in values)
+        ])
+
+    def create(self, validated_data):
+        """Apply the whole batch in a single transaction."""
+        auth_user = self.context['request'].user
+        creates = validated_data.get('create', [])
+        updates = validated_data.get('update', [])
+        deletes = validated_data.get('delete', [])
+        relations = {'tags': [], 'ingredients': []}
+
+        with transaction.atomic():
+            created = Recipe.objects.bulk_create([
+                Recipe(user=auth_user, **{
+                    key: value for key, value in item.items()
+                    if key not in relations
+                })
+                for item in creates
+            ])
+
+            instances = Recipe.objects\
+                .filter(user=auth_user)\
+                .in_bulk([item['id'] for item in updates])
+            updated = [instances[item['id']] for item in updates]
+            fields = set()
+            for recipe, item in zip(updated, updates):
+                for key, value in item.items():
+                    if key not in relations and key != 'id':
+                        setattr(recipe, key, value)
+                        fields.add(key)
+            if fields:
+                Recipe.objects.bulk_update(updated, fields)
+
+            for recipe, item in zip(created + updated, creates + updates):
+                for field in relations:
+                    if field in item:
+                        relations[field].append((recipe, item[field]))
+            self._set_attributes(Tag, 'tags', relations['tags'])
+            self._set_attributes(
+                Ingredient, 'ingredients', relations['ingredients'],
+            )
+
+            if deletes:
+                Recipe.objects.filter(user=auth_user, id__in=deletes).delete()
+
+            bump_data_version(auth_user.id)
+
+        recipes = Recipe.objects\
+            .prefetch_related('tags', 'ingredients')\
+            .in_bulk([recipe.id for recipe in created + updated])
+        return {
+            'create': [recipes[recipe.id] for recipe in created],
+            'update': [recipes[recipe.id] for recipe in updated],
+            'delete': deletes,
+        }
+
+
+class FacetSerializer(serializers.Serializer):
+    """Serializer for the recipe count of a tag or ingredient"""
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    count = serializers.IntegerField()
+
+
+class RecipeFacetsSerializer(serializers.Serializer):
+    """Serializer for recipe counts by tag and ingredient"""
+    count = serializers.IntegerField()
+    tags = FacetSerializer(many=True)
+    ingredients = FacetSerializer(many=True)
+
+
+class RecipeImportSerializer(serializers.ModelSerializer):
+    """Serializer for bulk imports of recipes"""
+    extensions = ('.ndjson', '.jsonl', '.csv')
+    file = serializers.FileField(write_only=True)
+
+    class Meta:
+        model = RecipeImport
+        fields = [
+            'id',
+            'file',
+            'job',
+            'processed',
+            'created',
+            'failed',
+            'errors',
+            'created_at',
+            'finished_at',
+        ]
+        read_only_fields = [field for field in fields if field != 'file']
+
+    def validate_file(self, value):
+        """Only accept NDJSON and CSV files."""
+        if not value.name.lower().endswith(self.extensions):
+            raise serializers.ValidationError(
+                'Upload an NDJSON (.ndjson, .jsonl) or CSV (.csv) file.'
+            )
+
+        return value
+
+    def create(self, validated_data):
+        """Store the uploaded file outside the media root."""
+        upload = validated_data.pop('file')
+        storage = FileSystemStorage(location=settings.RECIPE_IMPORT_ROOT)
+        extension = os.path.splitext(upload.name)[1].lower()
+        name = storage.save(f'{uuid.uuid4()}{extension}', upload)
+
+        return super().create({**validated_data, 'source': storage.path(name)})
+
+
+class CacheStatsSerializer(serializers.Serializer):
+    """Serializer for response cache statistics"""
+    hits = serializers.IntegerField()
+    misses = serializers.IntegerField()
@@ -0,0 +1,29 @@
+"""
+Signal handlers for the recipe app.
+"""
+from django.db import transaction
+from django.db.models.signals import (post_save, post_delete)
+from django.dispatch import receiver
+
+from core.models import (Recipe, Tag, Ingredient)
+from recipe.cache import bump_data_version
+from recipe.images import release_image
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_user_responses(sender, instance, **kwargs):
+    """Invalidate cached responses for the owner of a changed object."""
+    bump_data_version(instance.user_id)
+
+
+@receiver(post_delete, sender=Recipe)
+def release_recipe_image(sender, instance, **kwargs):
+    """Delete a deleted recipe's image once no other recipe uses it."""
+    if instance.image:
+        name, variants = instance.image.name, instance.image_variants
+        transaction.on_commit(lambda: release_image(name, variants))
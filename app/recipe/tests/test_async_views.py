@@ -0,0 +1,107 @@
+"""
+Tests for the async recipe read APIs.
+"""
+import asyncio
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TransactionTestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (Recipe, Tag, Ingredient)
+from recipe import async_views
+
+
+ASYNC_RECIPES_URL = reverse('recipe:async-recipe-list')
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def async_detail_url(recipe_id):
+    """Create async recipe detail URL"""
+    return reverse('recipe:async-recipe-detail', args=[recipe_id])
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe."""
+    defaults = {
+        'title': 'Sample recipe title',
+        'time_minutes': 22,
+        'price': Decimal('5.25'),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class AsyncRecipeApiTests(TransactionTestCase):
+    """Test the async views, whose queries run on other connections."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'test123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_views_are_async(self):
+        """Test the views are coroutine functions."""
+        self.assertTrue(
+            asyncio.iscoroutinefunction(async_views.recipe_list)
+        )
+
+    def test_auth_required(self):
+        """Test auth is required."""
+        res = APIClient().get(ASYNC_RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_list_matches_sync_view(self):
+        """Test the async list returns the same recipes as the sync one."""
+        recipe = create_recipe(self.user)
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+        create_recipe(self.user, title='Other recipe')
+
+        res = self.client.get(ASYNC_RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.json()['results'],
+            self.client.get(RECIPES_URL).json()['results'],
+        )
+
+    def test_retrieve(self):
+        """Test retrieving a recipe, limited to the user's own."""
+        recipe = create_recipe(self.user)
+        other = create_recipe(get_user_model().objects.create_user(
+            'other@example.com',
+            'test123',
+        ))
+
+        res = self.client.get(async_detail_url(recipe.id))
+        missing = self.client.get(async_detail_url(other.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()['title'], recipe.title)
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_attribute_lists(self):
+        """Test listing tags and ingredients."""
+        Tag.objects.create(user=self.user, name='Vegan')
+        Ingredient.objects.create(user=self.user, name='Kale')
+
+        tags = self.client.get(reverse('recipe:async-tag-list'))
+        ingredients = self.client.get(reverse('recipe:async-ingredient-list'))
+
+        self.assertEqual(
+            [tag['name'] for tag in tags.json()['results']],
+            ['Vegan'],
+        )
+        self.assertEqual(
+            [item['name'] for item in ingredients.json()['results']],
+            ['Kale'],
+        )
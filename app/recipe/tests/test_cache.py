@@ -0,0 +1,236 @@
+"""
+Tests for the recipe response cache.
+"""
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.test import (TestCase, override_settings)
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.db.routers import (PIN_KEY, ReplicaRouter, pin_user)
+from core.models import (Recipe, Tag)
+from recipe.cache import get_data_version
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+CACHE_STATS_URL = reverse('recipe:cache-stats')
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe."""
+    defaults = {
+        'title': 'Sample recipe title',
+        'time_minutes': 22,
+        'price': Decimal('5.25'),
+    }
+    defaults.update(params)
+
+    return Recipe.objects.create(user=user, **defaults)
+
+
+def create_user(**params):
+    """Create and return a user"""
+    return get_user_model().objects.create_user(**params)
+
+
+@override_settings(CACHE_SHARED=True)
+class ResponseCacheTests(TestCase):
+    """Test caching of list responses."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_list_served_from_cache(self):
+        """Test a repeated list request is a cache hit with no queries."""
+        create_recipe(user=self.user)
+
+        res = self.client.get(RECIPES_URL)
+        self.assertEqual(res['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(RECIPES_URL)
+
+        self.assertEqual(cached.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached['X-Cache'], 'HIT')
+        self.assertEqual(cached.data, res.data)
+
+    def test_query_params_cached_separately(self):
+        """Test different query parameters are cached separately."""
+        create_recipe(user=self.user)
+        create_recipe(user=self.user)
+
+        self.client.get(RECIPES_URL)
+        res = self.client.get(RECIPES_URL, {'page_size': 1})
+
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_cache_per_user(self):
+        """Test cached lists are not shared between users."""
+        other_user = create_user(
+            email='other@example.com',
+            password='password123',
+        )
+        create_recipe(user=other_user)
+        self.client.get(RECIPES_URL)
+
+        self.client.force_authenticate(other_user)
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_create_invalidates_cache(self):
+        """Test creating a recipe through the API invalidates the list."""
+        self.client.get(RECIPES_URL)
+        payload = {
+            'title': 'Thai Curry',
+            'time_minutes': 30,
+            'price': '10.50',
+            'tags': [{'name': 'Thai'}],
+        }
+        self.client.post(RECIPES_URL, payload, format='json')
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['tags'][0]['name'], 'Thai')
+
+    def test_attribute_update_invalidates_cache(self):
+        """Test renaming a tag invalidates cached recipes and tags."""
+        recipe = create_recipe(user=self.user)
+        tag = Tag.objects.create(user=self.user, name='Lunch')
+        recipe.tags.add(tag)
+        self.client.get(RECIPES_URL)
+        self.client.get(TAGS_URL)
+
+        url = reverse('recipe:tag-detail', args=[tag.id])
+        self.client.patch(url, {'name': 'Dinner'})
+
+        res = self.client.get(RECIPES_URL)
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data['results'][0]['tags'][0]['name'], 'Dinner')
+        res = self.client.get(TAGS_URL)
+        self.assertEqual(res.data['results'][0]['name'], 'Dinner')
+
+    def list_databases(self):
+        """List recipes and return the databases they were read from."""
+        databases = set()
+        db_for_read = ReplicaRouter.db_for_read
+
+        def spy(router, model, **hints):
+            if model is Recipe:
+                databases.add(db_for_read(router, model, **hints))
+            return DEFAULT_DB_ALIAS
+
+        with patch.object(ReplicaRouter, 'db_for_read', spy):
+            res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(len(res.data['results']), 1)
+        return databases
+
+    @override_settings(REPLICA_DATABASES=['replica_0'])
+    def test_fills_read_from_replica(self):
+        """Test cache misses of unpinned users read from a replica."""
+        create_recipe(user=self.user)
+        cache.delete(PIN_KEY.format(user_id=self.user.id))
+
+        self.assertEqual(self.list_databases(), {'replica_0'})
+
+    @override_settings(REPLICA_DATABASES=['replica_0'])
+    def test_pinned_fills_read_from_primary(self):
+        """Test cache misses of pinned users read from the primary."""
+        create_recipe(user=self.user)
+        pin_user(self.user.id)
+
+        self.assertEqual(self.list_databases(), {'default'})
+
+    def test_model_save_bumps_version(self):
+        """Test saving outside the API, such as the admin, bumps version."""
+        recipe = create_recipe(user=self.user)
+        version = get_data_version(self.user.id)
+
+        recipe.title = 'New title'
+        recipe.save()
+
+        self.assertNotEqual(get_data_version(self.user.id), version)
+
+    def test_delete_bumps_version(self):
+        """Test deleting an object bumps the owner's version."""
+        tag = Tag.objects.create(user=self.user, name='Lunch')
+        version = get_data_version(self.user.id)
+
+        tag.delete()
+
+        self.assertNotEqual(get_data_version(self.user.id), version)
+
+
+@override_settings(CACHE_SHARED=False)
+class ProcessLocalCacheTests(TestCase):
+    """Test responses are not cached when the cache is process-local."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_list_not_cached(self):
+        """Test lists are served from the database every time."""
+        self.client.get(RECIPES_URL)
+        create_recipe(user=self.user)
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertNotIn('X-Cache', res)
+        self.assertEqual(len(res.data['results']), 1)
+
+
+@override_settings(CACHE_SHARED=True)
+class CacheStatsApiTests(TestCase):
+    """Test the cache statistics API."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_stats_require_staff(self):
+        """Test only staff can read cache statistics."""
+        user = create_user(email='user@example.com', password='test123')
+        self.client.force_authenticate(user)
+
+        res = self.client.get(CACHE_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_stats_count_hits_and_misses(self):
+        """Test cache hits and misses are counted."""
+        admin = get_user_model().objects.create_superuser(
+            'admin@example.com',
+            'test123',
+        )
+        self.client.force_authenticate(admin)
+        before = self.client.get(CACHE_STATS_URL).data
+
+        self.client.get(RECIPES_URL)
+        self.client.get(RECIPES_URL)
+        res = self.client.get(CACHE_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['hits'], before['hits'] + 1)
+        self.assertEqual(res.data['misses'], before['misses'] + 1)
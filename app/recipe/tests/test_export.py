@@ -0,0 +1,106 @@
+"""
+Tests for the recipe export API.
+"""
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import (TestCase, override_settings)
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import (APIClient, APIRequestFactory)
+
+from core.models import (Recipe, Tag, Ingredient)
+from recipe.serializers import RecipeDetailSerializer
+
+
+EXPORT_URL = reverse('recipe:recipe-export')
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe."""
+    defaults = {
+        'title': 'Sample recipe title',
+        'time_minutes': 22,
+        'price': Decimal('5.25'),
+    }
+    defaults.update(params)
+
+    return Recipe.objects.create(user=user, **defaults)
+
+
+def read_lines(res):
+    """Return the parsed lines of a streamed NDJSON response."""
+    content = b''.join(res.streaming_content).decode()
+    return [json.loads(line) for line in content.splitlines()]
+
+
+class PublicExportApiTests(TestCase):
+    """Test unauthenticated export requests."""
+
+    def test_auth_required(self):
+        """Test auth is required to export recipes."""
+        res = APIClient().get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateExportApiTests(TestCase):
+    """Test exporting recipes."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_export_streams_all_recipes(self):
+        """Test every recipe is streamed with its tags and ingredients."""
+        for i in range(5):
+            recipe = create_recipe(self.user, title=f'Recipe {i}')
+            recipe.tags.add(Tag.objects.create(user=self.user, name=f'T{i}'))
+            recipe.ingredients.add(
+                Ingredient.objects.create(user=self.user, name=f'I{i}'),
+            )
+        other_user = get_user_model().objects.create_user(
+            'other@example.com',
+            'password123',
+        )
+        create_recipe(other_user)
+
+        with override_settings(RECIPE_EXPORT_CHUNK_SIZE=2):
+            res = self.client.get(EXPORT_URL)
+            lines = read_lines(res)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        self.assertIn('attachment', res['Content-Disposition'])
+        request = Request(APIRequestFactory().get(EXPORT_URL))
+        expected = RecipeDetailSerializer(
+            Recipe.objects.filter(user=self.user).order_by('-id'),
+            many=True,
+            context={'request': request},
+        ).data
+        self.assertEqual(lines, json.loads(json.dumps(expected)))
+
+    def test_export_with_accept_header(self):
+        """Test clients may ask for NDJSON explicitly."""
+        create_recipe(self.user)
+
+        res = self.client.get(EXPORT_URL, HTTP_ACCEPT='application/x-ndjson')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(read_lines(res)), 1)
+
+    def test_export_sparse_fields(self):
+        """Test the export honours ?fields=."""
+        create_recipe(self.user)
+
+        res = self.client.get(EXPORT_URL, {'fields': 'id,title'})
+
+        self.assertEqual(set(read_lines(res)[0]), {'id', 'title'})
@@ -0,0 +1,152 @@
+"""
+Tests for the recipe facets API.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import (TestCase, override_settings)
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (Recipe, Tag, Ingredient)
+
+
+FACETS_URL = reverse('recipe:recipe-facets')
+
+
+def create_recipe(user, tags=(), ingredients=(), **params):
+    """Create and return a recipe linked to tags and ingredients."""
+    defaults = {
+        'title': 'Sample recipe title',
+        'time_minutes': 22,
+        'price': Decimal('5.25'),
+    }
+    defaults.update(params)
+
+    recipe = Recipe.objects.create(user=user, **defaults)
+    recipe.tags.set(tags)
+    recipe.ingredients.set(ingredients)
+    return recipe
+
+
+class PublicFacetsApiTests(TestCase):
+    """Test unauthenticated facet requests."""
+
+    def test_auth_required(self):
+        """Test auth is required to count facets."""
+        res = APIClient().get(FACETS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateFacetsApiTests(TestCase):
+    """Test counting recipes by tag and ingredient."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.client.force_authenticate(self.user)
+
+        self.vegan = Tag.objects.create(user=self.user, name='Vegan')
+        self.dinner = Tag.objects.create(user=self.user, name='Dinner')
+        self.rice = Ingredient.objects.create(user=self.user, name='Rice')
+        self.tofu = Ingredient.objects.create(user=self.user, name='Tofu')
+        create_recipe(
+            self.user,
+            tags=[self.vegan, self.dinner],
+            ingredients=[self.rice, self.tofu],
+            title='Tofu fried rice',
+        )
+        create_recipe(
+            self.user,
+            tags=[self.dinner],
+            ingredients=[self.rice],
+            title='Chicken curry',
+        )
+        create_recipe(self.user, tags=[self.vegan], title='Green salad')
+
+        other_user = get_user_model().objects.create_user(
+            'other@example.com',
+            'password123',
+        )
+        create_recipe(
+            other_user,
+            tags=[Tag.objects.create(user=other_user, name='Vegan')],
+        )
+
+    def test_facets_without_filters(self):
+        """Test every recipe of the user is counted, most used first."""
+        res = self.client.get(FACETS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {
+            'count': 3,
+            'tags': [
+                {'id': self.vegan.id, 'name': 'Vegan', 'count': 2},
+                {'id': self.dinner.id, 'name': 'Dinner', 'count': 2},
+            ],
+            'ingredients': [
+                {'id': self.rice.id, 'name': 'Rice', 'count': 2},
+                {'id': self.tofu.id, 'name': 'Tofu', 'count': 1},
+            ],
+        })
+
+    def test_facets_with_filters(self):
+        """Test only recipes matching the filters are counted."""
+        res = self.client.get(FACETS_URL, {'tags': f'{self.vegan.id}'})
+
+        self.assertEqual(res.data['count'], 2)
+        self.assertEqual(res.data['tags'], [
+            {'id': self.vegan.id, 'name': 'Vegan', 'count': 2},
+            {'id': self.dinner.id, 'name': 'Dinner', 'count': 1},
+        ])
+        self.assertEqual(res.data['ingredients'], [
+            {'id': self.rice.id, 'name': 'Rice', 'count': 1},
+            {'id': self.tofu.id, 'name': 'Tofu', 'count': 1},
+        ])
+
+    def test_facets_with_search(self):
+        """Test search narrows the counted recipes."""
+        res = self.client.get(FACETS_URL, {'search': 'curry'})
+
+        self.assertEqual(res.data['count'], 1)
+        self.assertEqual(res.data['tags'], [
+            {'id': self.dinner.id, 'name': 'Dinner', 'count': 1},
+        ])
+
+    def test_facets_limit(self):
+        """Test ?limit= keeps the most used tags and ingredients."""
+        res = self.client.get(FACETS_URL, {'limit': 1})
+
+        self.assertEqual(len(res.data['tags']), 1)
+        self.assertEqual(len(res.data['ingredients']), 1)
+        self.assertEqual(res.data['ingredients'][0]['name'], 'Rice')
+
+    @override_settings(CACHE_SHARED=True)
+    def test_facets_cached_until_data_changes(self):
+        """Test repeated requests are cached until a recipe changes."""
+        res = self.client.get(FACETS_URL)
+        self.assertEqual(res['X-Cache'], 'MISS')
+
+        res = self.client.get(FACETS_URL)
+        self.assertEqual(res['X-Cache'], 'HIT')
+
+        res = self.client.post(reverse('recipe:recipe-list'), {
+            'title': 'Vegan chili',
+            'time_minutes': 40,
+            'price': '4.00',
+            'tags': [{'name': 'Vegan'}],
+        }, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.get(FACETS_URL)
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data['count'], 4)
+        self.assertEqual(res.data['tags'][0], {
+            'id': self.vegan.id, 'name': 'Vegan', 'count': 3,
+        })
@@ -0,0 +1,142 @@
+"""
+Tests for the fast read-only serialization path.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.request import Request
+from rest_framework.test import (APIClient, APIRequestFactory)
+
+from core.models import (Recipe, Tag, Ingredient)
+from recipe.fastpath import ValuesSerializer
+from recipe.serializers import (
+    RecipeSerializer,
+    RecipeDetailSerializer,
+    TagSerializer,
+)
+
+
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def sort_nested(data):
+    """Return serialized recipes with nested lists in ID order."""
+    for item in data:
+        for name in ('tags', 'ingredients'):
+            if name in item:
+                item[name] = sorted(item[name], key=lambda obj: obj['id'])
+    return data
+
+
+class ValuesSerializerTests(TestCase):
+    """Test the values serializer matches the model serializers."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        thai = Tag.objects.create(user=self.user, name='Thai')
+        dinner = Tag.objects.create(user=self.user, name='Dinner')
+        rice = Ingredient.objects.create(user=self.user, name='Rice')
+
+        curry = Recipe.objects.create(
+            user=self.user,
+            title='Green curry',
+            time_minutes=30,
+            price=Decimal('10.5'),
+            link='https://example.com/curry',
+            description='Spicy',
+            image='uploads/recipe/curry.jpg',
+        )
+        curry.tags.add(dinner, thai)
+        curry.ingredients.add(rice)
+        roast = Recipe.objects.create(
+            user=self.user,
+            title='Roast',
+            time_minutes=120,
+            price=Decimal('0'),
+        )
+        roast.tags.add(dinner)
+        Recipe.objects.create(
+            user=self.user,
+            title='Toast',
+            time_minutes=5,
+            price=Decimal('1.99'),
+        )
+        self.recipes = Recipe.objects.order_by('-id')
+
+    def assertMatchesSerializer(self, serializer_class, queryset, **kwargs):
+        """Assert the values serializer output equals the serializer's."""
+        expected = serializer_class(queryset, many=True, **kwargs).data
+        serializer = ValuesSerializer(serializer_class(**kwargs))
+
+        data = serializer.to_representation(list(serializer.values(queryset)))
+
+        self.assertEqual(sort_nested(data), sort_nested(expected))
+
+    def test_recipe_serializer_output(self):
+        self.assertMatchesSerializer(RecipeSerializer, self.recipes)
+
+    def test_recipe_detail_serializer_output(self):
+        request = Request(APIRequestFactory().get(RECIPES_URL))
+
+        self.assertMatchesSerializer(
+            RecipeDetailSerializer,
+            self.recipes,
+            context={'request': request},
+        )
+
+    def test_tag_serializer_output(self):
+        self.assertMatchesSerializer(TagSerializer, Tag.objects.all())
+
+    def test_nested_fetched_in_one_query_per_relation(self):
+        """Test rows and relations take three queries in total."""
+        serializer = ValuesSerializer(RecipeSerializer())
+
+        with self.assertNumQueries(3):
+            serializer.to_representation(
+                list(serializer.values(self.recipes))
+            )
+
+
+class FastListApiTests(TestCase):
+    """Test list endpoints return the serializer output."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_recipe_list_matches_serializer(self):
+        for i in range(5):
+            recipe = Recipe.objects.create(
+                user=self.user,
+                title=f'Recipe {i}',
+                time_minutes=i + 1,
+                price=Decimal(i) / 4,
+            )
+            recipe.tags.add(
+                Tag.objects.create(user=self.user, name=f'Tag {i}'),
+                Tag.objects.create(user=self.user, name='Shared'),
+            )
+            recipe.ingredients.add(
+                Ingredient.objects.create(user=self.user, name=f'Ing {i}'),
+            )
+
+        res = self.client.get(RECIPES_URL)
+
+        serializer = RecipeSerializer(
+            Recipe.objects.order_by('-id'),
+            many=True,
+        )
+        self.assertEqual(
+            sort_nested(res.data['results']),
+            sort_nested(serializer.data),
+        )
@@ -0,0 +1,155 @@
+"""
+Tests for recipe image variants.
+"""
+import os
+import tempfile
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from PIL import (Image, features)
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.jobs import (claim, job_name, run_job)
+from core.models import (Job, Recipe)
+from recipe.images import (
+    release_image,
+    render_image_variants,
+    save_variants,
+)
+from recipe.variants import (VARIANT_SIZES, render_variants)
+
+
+def detail_url(recipe_id):
+    """Create and return a recipe detail URL."""
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def image_upload_url(recipe_id):
+    """Create and return an image upload URL."""
+    return reverse('recipe:recipe-upload-image', args=[recipe_id])
+
+
+class RenderVariantsTests(TestCase):
+    """Test rendering image variants."""
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.root.name, 'uploads', 'recipe'))
+
+    def tearDown(self):
+        self.root.cleanup()
+
+    def save_image(self, size, name='uploads/recipe/photo.png'):
+        """Save an image of the given size under the root."""
+        Image.new('RGB', size, 'red').save(os.path.join(self.root.name, name))
+        return name
+
+    def test_variants_resized(self):
+        """Test each variant fits its size and keeps the aspect ratio."""
+        name = self.save_image((2000, 1000))
+
+        variants = render_variants(self.root.name, name)
+
+        expected = set(VARIANT_SIZES)
+        if features.check('webp'):
+            expected |= {f'{size_name}_webp' for size_name in VARIANT_SIZES}
+        self.assertEqual(set(variants), expected)
+        self.assertEqual(
+            variants['thumbnail'],
+            'uploads/recipe/photo-thumbnail.jpg',
+        )
+        with Image.open(os.path.join(self.root.name, variants['thumbnail'])) \
+                as thumbnail:
+            self.assertEqual(thumbnail.size, (320, 160))
+            self.assertEqual(thumbnail.format, 'JPEG')
+
+    def test_small_image_not_enlarged(self):
+        """Test images smaller than a variant keep their size."""
+        name = self.save_image((100, 50))
+
+        variants = render_variants(self.root.name, name)
+
+        with Image.open(os.path.join(self.root.name, variants['medium'])) \
+                as medium:
+            self.assertEqual(medium.size, (100, 50))
+
+
+class ImageVariantsApiTests(TestCase):
+    """Test image variants through the recipe API."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Sample recipe',
+            time_minutes=10,
+            price=Decimal('5.00'),
+            image='uploads/recipe/photo.jpg',
+        )
+
+    def tearDown(self):
+        self.recipe.refresh_from_db()
+        self.recipe.image.delete()
+
+    def test_upload_queues_variants_job(self):
+        """Test uploading queues a job that renders the variants."""
+        self.recipe.image_variants = {'thumbnail': 'old-thumbnail.jpg'}
+        self.recipe.save()
+
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as image_file:
+            Image.new('RGB', (640, 480)).save(image_file, format='JPEG')
+            image_file.seek(0)
+            res = self.client.post(
+                image_upload_url(self.recipe.id),
+                {'image': image_file},
+                format='multipart',
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['image_variants'], {})
+        job = Job.objects.get(user=self.user)
+        self.assertEqual(job.name, job_name(render_image_variants))
+
+        job, = claim()
+        self.assertTrue(run_job(job))
+
+        job.refresh_from_db()
+        self.recipe.refresh_from_db()
+        self.assertEqual(set(self.recipe.image_variants), set(job.result))
+        for name in self.recipe.image_variants.values():
+            self.assertTrue(self.recipe.image.storage.exists(name))
+        release_image(self.recipe.image.name, self.recipe.image_variants)
+
+    def test_detail_returns_variant_urls(self):
+        """Test saved variants are returned as absolute URLs."""
+        save_variants(self.recipe.id, 'uploads/recipe/photo.jpg', {
+            'thumbnail': 'uploads/recipe/photo-thumbnail.jpg',
+        })
+
+        res = self.client.get(detail_url(self.recipe.id))
+
+        self.assertEqual(
+            res.data['image_variants'],
+            {
+                'thumbnail': 'http://testserver/static/media/'
+                             'uploads/recipe/photo-thumbnail.jpg',
+            },
+        )
+
+    def test_variants_of_replaced_image_ignored(self):
+        """Test variants rendered for an older image are not saved."""
+        save_variants(self.recipe.id, 'uploads/recipe/old.jpg', {
+            'thumbnail': 'uploads/recipe/old-thumbnail.jpg',
+        })
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_variants, {})
@@ -0,0 +1,314 @@
+"""
+Tests for bulk recipe imports.
+"""
+import json
+import os
+import tempfile
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import (TestCase, override_settings)
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.jobs import (claim, run_job)
+from core.models import (Recipe, RecipeImport, Tag, Ingredient)
+from recipe.imports import (
+    ImportInterrupted,
+    import_batch,
+    read_records,
+    run_import,
+)
+
+
+IMPORTS_URL = reverse('recipe:recipeimport-list')
+
+
+def detail_url(import_id):
+    """Create and return an import detail URL."""
+    return reverse('recipe:recipeimport-detail', args=[import_id])
+
+
+def write_file(directory, name, content):
+    """Write a file and return its path."""
+    path = os.path.join(directory, name)
+    with open(path, 'w') as output:
+        output.write(content)
+    return path
+
+
+def ndjson(records):
+    """Return records as newline delimited JSON."""
+    return ''.join(f'{json.dumps(record)}\n' for record in records)
+
+
+class ImportTests(TestCase):
+    """Test reading and importing records."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_read_csv(self):
+        """Test CSV rows hold tag and ingredient names split on "|"."""
+        path = write_file(
+            self.tmp.name,
+            'recipes.csv',
+            'title,time_minutes,price,tags,ingredients\n'
+            'Curry,30,10.50,Thai|Dinner,Rice\n'
+            'Toast,5,1.00,,\n',
+        )
+
+        records = list(read_records(path))
+
+        self.assertEqual(records[0]['tags'], [
+            {'name': 'Thai'}, {'name': 'Dinner'},
+        ])
+        self.assertEqual(records[0]['ingredients'], [{'name': 'Rice'}])
+        self.assertEqual(records[1]['tags'], [])
+        self.assertEqual(list(read_records(path, 1)), records[1:])
+
+    def test_read_ndjson(self):
+        """Test NDJSON lines are parsed, skipping blank lines."""
+        path = write_file(
+            self.tmp.name,
+            'recipes.ndjson',
+            '{"title": "Curry"}\n\nnot json\n{"title": "Toast"}\n',
+        )
+
+        self.assertEqual(
+            list(read_records(path)),
+            [{'title': 'Curry'}, None, {'title': 'Toast'}],
+        )
+        self.assertEqual(list(read_records(path, 2)), [{'title': 'Toast'}])
+
+    def test_import_batch(self):
+        """Test valid records are created and invalid ones reported."""
+        Tag.objects.create(user=self.user, name='Thai')
+        records = [
+            {
+                'title': 'Curry',
+                'time_minutes': 30,
+                'price': '10.50',
+                'tags': [{'name': 'Thai'}, {'name': 'Dinner'}],
+                'ingredients': [{'name': 'Rice'}],
+            },
+            {'title': 'No time', 'price': '1.00'},
+            None,
+            {'title': 'Toast', 'time_minutes': 5, 'price': '1.00'},
+        ]
+
+        created, errors = import_batch(self.user, records, 10)
+
+        self.assertEqual(created, 2)
+        self.assertEqual([error['record'] for error in errors], [11, 12])
+        self.assertIn('time_minutes', errors[0]['errors'])
+        curry = Recipe.objects.get(title='Curry')
+        self.assertEqual(curry.price, Decimal('10.50'))
+        self.assertEqual(
+            sorted(tag.name for tag in curry.tags.all()), ['Dinner', 'Thai'],
+        )
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(curry.ingredients.get().name, 'Rice')
+
+    def test_run_import_checkpoints(self):
+        """Test progress is saved after every batch."""
+        path = write_file(self.tmp.name, 'recipes.ndjson', ndjson(
+            {'title': f'Recipe {i}', 'time_minutes': 5, 'price': '1.00'}
+            for i in range(5)
+        ) + '{"title": "Bad"}\n')
+        recipe_import = RecipeImport.objects.create(
+            user=self.user,
+            source=path,
+        )
+        progress = []
+
+        result = run_import(
+            recipe_import.id,
+            batch_size=2,
+            report=lambda p: progress.append(p.processed),
+        )
+
+        self.assertEqual(progress, [2, 4, 6])
+        self.assertEqual(
+            result, {'processed': 6, 'created': 5, 'failed': 1},
+        )
+        recipe_import.refresh_from_db()
+        self.assertEqual(recipe_import.errors[0]['record'], 5)
+        self.assertIsNotNone(recipe_import.finished_at)
+
+    def test_run_import_reports_missing_price(self):
+        """Test a record without a price is reported, not imported."""
+        path = write_file(self.tmp.name, 'recipes.ndjson', ndjson([
+            {'title': 'Curry', 'time_minutes': 30, 'price': '10.50'},
+            {'title': 'Soup', 'time_minutes': 5},
+            {'title': 'Toast', 'time_minutes': 5, 'price': '1.00'},
+        ]))
+        recipe_import = RecipeImport.objects.create(
+            user=self.user,
+            source=path,
+        )
+
+        result = run_import(recipe_import.id)
+
+        self.assertEqual(
+            result, {'processed': 3, 'created': 2, 'failed': 1},
+        )
+        self.assertEqual(
+            sorted(Recipe.objects.values_list('title', flat=True)),
+            ['Curry', 'Toast'],
+        )
+        recipe_import.refresh_from_db()
+        self.assertEqual(recipe_import.errors[0]['record'], 1)
+        self.assertIn('price', recipe_import.errors[0]['errors'])
+
+    def test_run_import_stops_when_taken_over(self):
+        """Test an import resumed elsewhere is not imported twice."""
+        path = write_file(self.tmp.name, 'recipes.ndjson', ndjson(
+            {'title': f'Recipe {i}', 'time_minutes': 5, 'price': '1.00'}
+            for i in range(4)
+        ))
+        recipe_import = RecipeImport.objects.create(
+            user=self.user,
+            source=path,
+        )
+
+        def take_over(progress):
+            RecipeImport.objects.filter(id=progress.id).update(processed=4)
+
+        with self.assertRaises(ImportInterrupted):
+            run_import(recipe_import.id, batch_size=2, report=take_over)
+
+        self.assertEqual(Recipe.objects.count(), 2)
+
+    def test_run_import_stops_when_claim_lost(self):
+        """Test an import job stops once another worker claims it."""
+        path = write_file(self.tmp.name, 'recipes.ndjson', ndjson(
+            {'title': f'Recipe {i}', 'time_minutes': 5, 'price': '1.00'}
+            for i in range(4)
+        ))
+        recipe_import = RecipeImport.objects.create(
+            user=self.user,
+            source=path,
+        )
+
+        with patch('recipe.imports.touch', side_effect=[True, False]):
+            with self.assertRaises(ImportInterrupted):
+                run_import(recipe_import.id, batch_size=2)
+
+        self.assertEqual(Recipe.objects.count(), 2)
+
+
+class PublicImportApiTests(TestCase):
+    """Test unauthenticated import requests."""
+
+    def test_auth_required(self):
+        """Test auth is required to import recipes."""
+        res = APIClient().get(IMPORTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateImportApiTests(TestCase):
+    """Test uploading imports."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.client.force_authenticate(self.user)
+        self.tmp = tempfile.TemporaryDirectory()
+        settings = override_settings(RECIPE_IMPORT_ROOT=self.tmp.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def upload(self, name, content):
+        """Upload a file to import."""
+        path = write_file(self.tmp.name, name, content)
+        with open(path, 'rb') as upload:
+            return self.client.post(
+                IMPORTS_URL, {'file': upload}, format='multipart',
+            )
+
+    def test_upload_queues_import(self):
+        """Test an upload is accepted and imported by a background job."""
+        res = self.upload('upload.csv', (
+            'title,time_minutes,price,tags,ingredients\n'
+            'Curry,30,10.50,Thai,Rice|Chicken\n'
+        ))
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertNotIn('file', res.data)
+        self.assertEqual(Recipe.objects.count(), 0)
+        recipe_import = RecipeImport.objects.get(id=res.data['id'])
+        self.assertEqual(recipe_import.user, self.user)
+        self.assertEqual(res.data['job'], recipe_import.job_id)
+
+        job, = claim()
+        self.assertEqual(job.id, recipe_import.job_id)
+        self.assertTrue(run_job(job))
+
+        res = self.client.get(detail_url(recipe_import.id))
+        self.assertEqual(res.data['created'], 1)
+        self.assertIsNotNone(res.data['finished_at'])
+        recipe = Recipe.objects.get(user=self.user)
+        self.assertEqual(recipe.ingredients.count(), 2)
+        self.assertEqual(Ingredient.objects.count(), 2)
+        self.assertFalse(os.path.exists(recipe_import.source))
+
+    def test_upload_rejects_other_files(self):
+        """Test only NDJSON and CSV files are accepted."""
+        res = self.upload('recipes.txt', 'title\n')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(RecipeImport.objects.exists())
+
+    @override_settings(RECIPE_IMPORT_MAX_SIZE=10)
+    def test_upload_too_large(self):
+        """Test import files over the size cap are refused."""
+        res = self.upload('recipes.ndjson', ndjson([{'title': 'Curry'}] * 5))
+
+        self.assertEqual(
+            res.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+
+    @override_settings(RECIPE_IMAGE_MAX_SIZE=10)
+    def test_upload_not_limited_by_image_cap(self):
+        """Test the image size cap does not apply to imports."""
+        res = self.upload('recipes.ndjson', ndjson([{'title': 'Curry'}] * 5))
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+
+    def test_list_limited_to_user(self):
+        """Test only the user's imports are listed."""
+        other_user = get_user_model().objects.create_user(
+            'other@example.com',
+            'password123',
+        )
+        RecipeImport.objects.create(user=other_user, source='other.csv')
+        recipe_import = RecipeImport.objects.create(
+            user=self.user,
+            source='mine.csv',
+        )
+
+        res = self.client.get(IMPORTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['id'] for item in res.data['results']], [recipe_import.id],
+        )
+        self.assertNotIn('source', res.data['results'][0])
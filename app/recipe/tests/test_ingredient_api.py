@@ -18,6 +18,7 @@ from recipe.serializers import IngredientSerializer
 
 
 INGREDIENTS_URL = reverse('recipe:ingredient-list')
+AUTOCOMPLETE_URL = reverse('recipe:ingredient-autocomplete')
 
 
 def detail_url(tag_id):
@@ -59,7 +60,7 @@ class PrivateTagsAPITest(TestCase):
         serializer = IngredientSerializer(ingredients, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_ingredients_limited_by_user(self):
         user2 = create_user(email='example2@example.com')
@@ -70,9 +71,9 @@ class PrivateTagsAPITest(TestCase):
         res = self.client.get(INGREDIENTS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], expected.name)
-        self.assertEqual(res.data[0]['id'], expected.id)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], expected.name)
+        self.assertEqual(res.data['results'][0]['id'], expected.id)
 
     def test_update_ingredient(self):
         """Test update ingredient"""
@@ -112,8 +113,8 @@ class PrivateTagsAPITest(TestCase):
 
         s1 = IngredientSerializer(ingredient)
         s2 = IngredientSerializer(ingredient2)
-        self.assertIn(s1.data, res.data)
-        self.assertNotIn(s2.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertNotIn(s2.data, res.data['results'])
 
     def test_filtered_ingredients_unique(self):
         recipe1 = Recipe.objects.create(
@@ -136,4 +137,77 @@ class PrivateTagsAPITest(TestCase):
 
         res = self.client.get(INGREDIENTS_URL, {'assigned_only': 1})
 
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_ingredients_with_counts(self):
+        """Test listing ingredients with the number of recipes using them."""
+        ingredient = Ingredient.objects.create(user=self.user, name='Eggs')
+        unused = Ingredient.objects.create(user=self.user, name='Salt')
+        for title in ['Thai Curry', 'Poached Eggs']:
+            recipe = Recipe.objects.create(
+                user=self.user,
+                title=title,
+                time_minutes=22,
+                price=Decimal('5.25'),
+            )
+            recipe.ingredients.add(ingredient)
+
+        res = self.client.get(INGREDIENTS_URL, {'with_counts': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        counts = {
+            item['id']: item['recipe_count'] for item in res.data['results']
+        }
+        self.assertEqual(counts, {ingredient.id: 2, unused.id: 0})
+
+        res = self.client.get(
+            INGREDIENTS_URL, {'with_counts': 1, 'assigned_only': 1},
+        )
+
+        self.assertEqual(res.data['results'], [
+            {'id': ingredient.id, 'name': 'Eggs', 'recipe_count': 2},
+        ])
+
+
+class IngredientAutocompleteApiTests(TestCase):
+    """Test autocompleting ingredient names."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for name in ['Pepper', 'paprika', 'Parsley', 'Tomato', 'Potato']:
+            Ingredient.objects.create(user=self.user, name=name)
+
+    def test_autocomplete_prefix(self):
+        """Test names starting with the query are suggested, in order."""
+        other_user = create_user(email='other@example.com')
+        Ingredient.objects.create(user=other_user, name='paprika')
+
+        res = self.client.get(AUTOCOMPLETE_URL, {'q': 'PA'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['name'] for item in res.data], ['paprika', 'Parsley'],
+        )
+
+    def test_autocomplete_similar(self):
+        """Test misspelt queries suggest similar names."""
+        res = self.client.get(AUTOCOMPLETE_URL, {'q': 'tomatoe'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]['name'], 'Tomato')
+
+    def test_autocomplete_limit(self):
+        """Test the number of suggestions is capped by ?limit=."""
+        res = self.client.get(AUTOCOMPLETE_URL, {'q': 'PA', 'limit': 1})
+
+        self.assertEqual(
+            [item['name'] for item in res.data], ['paprika'],
+        )
+
+    def test_autocomplete_requires_query(self):
+        """Test a query is required."""
+        res = self.client.get(AUTOCOMPLETE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
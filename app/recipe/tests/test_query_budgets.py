@@ -0,0 +1,435 @@
+"""
+Query budget tests for the recipe APIs.
+"""
+import tempfile
+from decimal import Decimal
+from PIL import Image
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.core.cache import cache
+from django.test import (TestCase, TransactionTestCase, override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.urls import (URLResolver, reverse)
+
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (Recipe, RecipeImport, Tag, Ingredient)
+from recipe.urls import urlpatterns
+
+
+# Maximum number of queries each endpoint may run, keyed on URL name and
+# HTTP method. Every route under /api/recipe/ must have an entry here.
+QUERY_BUDGETS = {
+    ('api-root', 'GET'): 0,
+    ('recipe-list', 'GET'): 3,
+    ('recipe-list', 'POST'): 9,
+    ('recipe-detail', 'GET'): 3,
+    ('recipe-detail', 'PUT'): 6,
+    ('recipe-detail', 'PATCH'): 14,
+    ('recipe-detail', 'DELETE'): 7,
+    ('recipe-upload-image', 'POST'): 6,
+    ('recipe-bulk', 'POST'): 21,
+    ('recipe-export', 'GET'): 3,
+    ('recipe-facets', 'GET'): 5,
+    ('tag-list', 'GET'): 1,
+    ('tag-detail', 'PATCH'): 2,
+    ('tag-detail', 'DELETE'): 3,
+    ('tag-autocomplete', 'GET'): 2,
+    ('ingredient-list', 'GET'): 1,
+    ('ingredient-detail', 'PATCH'): 2,
+    ('ingredient-detail', 'DELETE'): 3,
+    ('ingredient-autocomplete', 'GET'): 2,
+    ('recipeimport-list', 'GET'): 1,
+    ('recipeimport-list', 'POST'): 5,
+    ('recipeimport-detail', 'GET'): 1,
+    ('cache-stats', 'GET'): 0,
+    ('async-recipe-list', 'GET'): 3,
+    ('async-recipe-detail', 'GET'): 3,
+    ('async-tag-list', 'GET'): 1,
+    ('async-ingredient-list', 'GET'): 1,
+}
+
+
+def route_names(patterns):
+    """Yield the names of URL patterns, including included ones."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from route_names(pattern.url_patterns)
+        elif pattern.name:
+            yield pattern.name
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe with a tag and ingredient."""
+    defaults = {
+        'title': 'Sample recipe title',
+        'time_minutes': 22,
+        'price': Decimal('5.25'),
+    }
+    defaults.update(params)
+
+    recipe = Recipe.objects.create(user=user, **defaults)
+    recipe.tags.add(Tag.objects.create(user=user, name='Dinner'))
+    recipe.ingredients.add(Ingredient.objects.create(user=user, name='Salt'))
+    return recipe
+
+
+class QueryBudgetTestCase(TestCase):
+    """Base test case asserting requests stay within their query budget."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def request(self, method, url_name, args=None, **kwargs):
+        """Make a request and fail if it goes over its query budget."""
+        budget = QUERY_BUDGETS[(url_name, method)]
+        url = reverse(f'recipe:{url_name}', args=args)
+        with CaptureQueriesContext(connection) as ctx:
+            res = getattr(self.client, method.lower())(url, **kwargs)
+            if res.streaming:
+                res.streamed_content = b''.join(res.streaming_content)
+
+        queries = '\n'.join(query['sql'] for query in ctx.captured_queries)
+        self.assertLessEqual(
+            len(ctx),
+            budget,
+            f'{method} {url_name} ran {len(ctx)} queries, '
+            f'budget is {budget}:\n{queries}',
+        )
+        return res
+
+
+class QueryBudgetCoverageTests(TestCase):
+    """Test every recipe endpoint has a query budget."""
+
+    def test_all_routes_have_budget(self):
+        budgeted = {url_name for url_name, method in QUERY_BUDGETS}
+        for name in route_names(urlpatterns):
+            self.assertIn(name, budgeted)
+
+
+class AsyncQueryBudgetTests(TransactionTestCase):
+    """Test async endpoints run a fixed number of queries.
+
+    Their queries run on the database worker threads, so they are
+    counted by the request metrics rather than on this thread.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def request(self, url_name, args=None):
+        """Make a GET request and fail if it goes over its query budget."""
+        budget = QUERY_BUDGETS[(url_name, 'GET')]
+        labels = {'route': f'recipe:{url_name}', 'method': 'GET'}
+        name = 'http_request_db_queries_sum'
+        before = REGISTRY.get_sample_value(name, labels) or 0
+
+        res = self.client.get(reverse(f'recipe:{url_name}', args=args))
+
+        queries = REGISTRY.get_sample_value(name, labels) - before
+        self.assertLessEqual(
+            queries,
+            budget,
+            f'GET {url_name} ran {queries:.0f} queries, budget is {budget}',
+        )
+        return res
+
+    def test_async_endpoints_budget(self):
+        recipes = [
+            create_recipe(self.user, title=f'Recipe {i}') for i in range(5)
+        ]
+
+        res = self.request('async-recipe-list')
+        self.assertEqual(len(res.json()['results']), 5)
+
+        res = self.request('async-recipe-detail', args=[recipes[0].id])
+        self.assertEqual(len(res.json()['tags']), 1)
+
+        res = self.request('async-tag-list')
+        self.assertEqual(len(res.json()['results']), 5)
+
+        res = self.request('async-ingredient-list')
+        self.assertEqual(len(res.json()['results']), 5)
+
+
+class RecipeQueryBudgetTests(QueryBudgetTestCase):
+    """Test recipe endpoints run a fixed number of queries."""
+
+    def test_list_budget_independent_of_size(self):
+        create_recipe(self.user)
+        self.request('GET', 'recipe-list')
+
+        for i in range(20):
+            create_recipe(self.user, title=f'Recipe {i}')
+        res = self.request('GET', 'recipe-list')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 21)
+
+    def test_deep_page_budget(self):
+        for i in range(10):
+            create_recipe(self.user, title=f'Recipe {i}')
+
+        res = self.request('GET', 'recipe-list', data={'page_size': 2})
+        while res.data['next']:
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.get(res.data['next'])
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(
+                len(ctx), QUERY_BUDGETS[('recipe-list', 'GET')],
+            )
+
+    def test_filtered_list_budget(self):
+        recipe = create_recipe(self.user)
+        tag = recipe.tags.first()
+        ingredient = recipe.ingredients.first()
+
+        params = {'tags': f'{tag.id}', 'ingredients': f'{ingredient.id}'}
+        res = self.request('GET', 'recipe-list', data=params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_detail_budget(self):
+        recipe = create_recipe(self.user)
+
+        res = self.request('GET', 'recipe-detail', args=[recipe.id])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['tags']), 1)
+        self.assertEqual(len(res.data['ingredients']), 1)
+
+    def test_create_budget(self):
+        payload = {
+            'title': 'Thai Curry',
+            'time_minutes': 30,
+            'price': Decimal('10.50'),
+            'tags': [{'name': 'Thai'}],
+            'ingredients': [{'name': 'Rice'}],
+        }
+        res = self.request('POST', 'recipe-list', data=payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_create_budget_independent_of_nested_items(self):
+        Tag.objects.create(user=self.user, name='Tag 0')
+        Ingredient.objects.create(user=self.user, name='Ingredient 0')
+        payload = {
+            'title': 'Big recipe',
+            'time_minutes': 30,
+            'price': Decimal('10.50'),
+            'tags': [{'name': f'Tag {i}'} for i in range(10)],
+            'ingredients': [{'name': f'Ingredient {i}'} for i in range(25)],
+        }
+        res = self.request('POST', 'recipe-list', data=payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data['tags']), 10)
+        self.assertEqual(len(res.data['ingredients']), 25)
+
+    def test_full_update_budget(self):
+        recipe = create_recipe(self.user)
+        payload = {
+            'title': 'New title',
+            'time_minutes': 10,
+            'price': Decimal('1.00'),
+        }
+
+        res = self.request(
+            'PUT', 'recipe-detail', args=[recipe.id],
+            data=payload, format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_partial_update_budget(self):
+        recipe = create_recipe(self.user)
+        payload = {
+            'tags': [{'name': 'Lunch'}],
+            'ingredients': [{'name': 'Pepper'}],
+        }
+
+        res = self.request(
+            'PATCH', 'recipe-detail', args=[recipe.id],
+            data=payload, format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_partial_update_budget_independent_of_nested_items(self):
+        recipe = create_recipe(self.user)
+        payload = {
+            'tags': [{'name': f'Tag {i}'} for i in range(10)],
+            'ingredients': [{'name': f'Ingredient {i}'} for i in range(25)],
+        }
+
+        res = self.request(
+            'PATCH', 'recipe-detail', args=[recipe.id],
+            data=payload, format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(recipe.ingredients.count(), 25)
+
+    def test_delete_budget(self):
+        recipe = create_recipe(self.user)
+
+        res = self.request('DELETE', 'recipe-detail', args=[recipe.id])
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_upload_image_budget(self):
+        recipe = create_recipe(self.user)
+
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as image_file:
+            img = Image.new('RGB', (10, 10))
+            img.save(image_file, format='JPEG')
+            image_file.seek(0)
+            res = self.request(
+                'POST', 'recipe-upload-image', args=[recipe.id],
+                data={'image': image_file}, format='multipart',
+            )
+
+        recipe.refresh_from_db()
+        recipe.image.delete()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_export_budget_independent_of_size(self):
+        for i in range(20):
+            create_recipe(self.user, title=f'Recipe {i}')
+
+        res = self.request('GET', 'recipe-export')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.streamed_content.splitlines()), 20)
+
+    def test_bulk_budget_independent_of_batch_size(self):
+        updated = [create_recipe(self.user) for i in range(3)]
+        deleted = [create_recipe(self.user) for i in range(3)]
+        payload = {
+            'create': [
+                {
+                    'title': f'Recipe {i}',
+                    'time_minutes': 5,
+                    'price': '1.00',
+                    'tags': [{'name': f'Tag {i}'}, {'name': 'Dinner'}],
+                    'ingredients': [{'name': f'Ingredient {i}'}],
+                }
+                for i in range(20)
+            ],
+            'update': [
+                {'id': recipe.id, 'tags': [{'name': 'Lunch'}]}
+                for recipe in updated
+            ],
+            'delete': [recipe.id for recipe in deleted],
+        }
+
+        res = self.request('POST', 'recipe-bulk', data=payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['create']), 20)
+
+    def test_facets_budget_independent_of_size(self):
+        for i in range(20):
+            create_recipe(self.user, title=f'Recipe {i}')
+        tag = Tag.objects.filter(user=self.user).first()
+
+        res = self.request('GET', 'recipe-facets')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.request('GET', 'recipe-facets', data={'tags': tag.id})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_api_root_budget(self):
+        res = self.request('GET', 'api-root')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_cache_stats_budget(self):
+        self.user.is_staff = True
+
+        res = self.request('GET', 'cache-stats')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class AttributeQueryBudgetTests(QueryBudgetTestCase):
+    """Test tag and ingredient endpoints run a fixed number of queries."""
+
+    def test_attribute_endpoints_budget(self):
+        for i in range(5):
+            create_recipe(self.user, title=f'Recipe {i}')
+
+        for prefix, model in (('tag', Tag), ('ingredient', Ingredient)):
+            obj = model.objects.filter(user=self.user).first()
+
+            res = self.request('GET', f'{prefix}-list')
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+            res = self.request(
+                'GET', f'{prefix}-list', data={'assigned_only': 1},
+            )
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+            res = self.request(
+                'GET', f'{prefix}-list', data={'with_counts': 1},
+            )
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+            res = self.request(
+                'GET', f'{prefix}-autocomplete', data={'q': 'Sample'},
+            )
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+            res = self.request(
+                'PATCH', f'{prefix}-detail', args=[obj.id],
+                data={'name': 'Renamed'},
+            )
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+            res = self.request('DELETE', f'{prefix}-detail', args=[obj.id])
+            self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+
+class ImportQueryBudgetTests(QueryBudgetTestCase):
+    """Test import endpoints run a fixed number of queries."""
+
+    def test_import_endpoints_budget(self):
+        with tempfile.TemporaryDirectory() as root, \
+                override_settings(RECIPE_IMPORT_ROOT=root), \
+                tempfile.NamedTemporaryFile(suffix='.ndjson') as upload:
+            upload.write(b'{"title": "Soup", "time_minutes": 5}\n')
+            upload.seek(0)
+            res = self.request(
+                'POST', 'recipeimport-list',
+                data={'file': upload}, format='multipart',
+            )
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+
+        for i in range(5):
+            RecipeImport.objects.create(user=self.user, source=f'{i}.csv')
+
+        res = self.request('GET', 'recipeimport-list')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 6)
+
+        res = self.request(
+            'GET', 'recipeimport-detail', args=[res.data['results'][0]['id']],
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -3,11 +3,12 @@ Tests for recipe APIs.
 """
 import tempfile
 import os
+from unittest.mock import patch
 from PIL import Image
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import (TestCase, override_settings)
 from django.urls import reverse
 
 
@@ -49,6 +50,9 @@ def create_user(**params):
     return get_user_model().objects.create_user(**params)
 
 
+BULK_URL = reverse('recipe:recipe-bulk')
+
+
 def image_upload_url(recipe_id):
     return reverse('recipe:recipe-upload-image', args=[recipe_id])
 
@@ -87,7 +91,7 @@ class PrivateRecipeApiTests(TestCase):
         recipes = Recipe.objects.all().order_by('-id')
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_recipe_list_limited_to_user(self):
         """Test list of recipes is limited to authenticated user."""
@@ -103,7 +107,7 @@ class PrivateRecipeApiTests(TestCase):
         recipes = Recipe.objects.filter(user=self.user)
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_get_recipe_detail(self):
         """Test get recipe detail."""
@@ -261,6 +265,21 @@ class PrivateRecipeApiTests(TestCase):
                 .exists()
             self.assertTrue(exists)
 
+    def test_create_recipe_with_duplicate_tags(self):
+        """Test repeated tag names in a payload resolve to one tag."""
+        payload = {
+            'title': 'Pad Thai',
+            'time_minutes': 20,
+            'price': Decimal('8.50'),
+            'tags': [{'name': 'Thai'}, {'name': 'Thai'}],
+        }
+        res = self.client.post(RECIPES_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        recipe = Recipe.objects.get(id=res.data['id'])
+        self.assertEqual(recipe.tags.count(), 1)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+
     def test_create_tag_on_update(self):
         recipe = create_recipe(user=self.user)
 
@@ -408,9 +427,9 @@ class PrivateRecipeApiTests(TestCase):
         s2 = RecipeSerializer(r2)
         s3 = RecipeSerializer(r3)
 
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertIn(s2.data, res.data['results'])
+        self.assertNotIn(s3.data, res.data['results'])
 
     def test_filter_by_ingredients(self):
         r1 = create_recipe(user=self.user, title='Thai Curry')
@@ -430,9 +449,556 @@ class PrivateRecipeApiTests(TestCase):
         s2 = RecipeSerializer(r2)
         s3 = RecipeSerializer(r3)
 
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertIn(s2.data, res.data['results'])
+        self.assertNotIn(s3.data, res.data['results'])
+
+    def test_filter_returns_each_recipe_once(self):
+        """Test recipes matching several filter IDs are not duplicated."""
+        recipe = create_recipe(user=self.user)
+        tag1 = Tag.objects.create(user=self.user, name='Thai')
+        tag2 = Tag.objects.create(user=self.user, name='Vegan')
+        recipe.tags.add(tag1, tag2)
+
+        params = {'tags': f'{tag1.id},{tag2.id}'}
+        res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_filter_match_all(self):
+        """Test match=all returns recipes carrying every listed ID."""
+        r1 = create_recipe(user=self.user, title='Thai Curry')
+        r2 = create_recipe(user=self.user, title='Lamb Roast')
+        tag1 = Tag.objects.create(user=self.user, name='Thai')
+        tag2 = Tag.objects.create(user=self.user, name='Dinner')
+        ingr1 = Ingredient.objects.create(user=self.user, name='Rice')
+        ingr2 = Ingredient.objects.create(user=self.user, name='Lamb')
+        r1.tags.add(tag1, tag2)
+        r1.ingredients.add(ingr1, ingr2)
+        r2.tags.add(tag2)
+        r2.ingredients.add(ingr1, ingr2)
+
+        params = {
+            'tags': f'{tag1.id},{tag2.id}',
+            'ingredients': f'{ingr1.id},{ingr2.id}',
+            'match': 'all',
+        }
+        res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data['results'], [RecipeSerializer(r1).data],
+        )
+
+    def test_filter_invalid_match(self):
+        """Test an unknown match mode returns an error."""
+        res = self.client.get(RECIPES_URL, {'tags': '1', 'match': 'some'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RecipePaginationTests(TestCase):
+    """Test cursor pagination of the recipe list."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_paginate_recipes(self):
+        """Test following cursors returns every recipe once, newest first."""
+        recipes = [
+            create_recipe(user=self.user, title=f'Recipe {i}')
+            for i in range(5)
+        ]
+
+        ids = []
+        url = RECIPES_URL + '?page_size=2'
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(res.data['results']), 2)
+            ids += [recipe['id'] for recipe in res.data['results']]
+            url = res.data['next']
+
+        self.assertEqual(ids, [recipe.id for recipe in reversed(recipes)])
+
+    def test_cursor_stable_after_insert(self):
+        """Test new recipes do not shift the following pages."""
+        recipes = [
+            create_recipe(user=self.user, title=f'Recipe {i}')
+            for i in range(4)
+        ]
+
+        res = self.client.get(RECIPES_URL, {'page_size': 2})
+        create_recipe(user=self.user, title='Newest recipe')
+        res = self.client.get(res.data['next'])
+
+        ids = [recipe['id'] for recipe in res.data['results']]
+        self.assertEqual(ids, [recipes[1].id, recipes[0].id])
+
+    def test_page_size_capped(self):
+        """Test the requested page size is capped."""
+        create_recipe(user=self.user)
+
+        with patch(
+            'recipe.pagination.RecipeCursorPagination.max_page_size', 1
+        ):
+            create_recipe(user=self.user)
+            res = self.client.get(RECIPES_URL, {'page_size': 50})
+
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertIsNotNone(res.data['next'])
+
+    @override_settings(API_PAGE_SIZE=1)
+    def test_default_page_size_setting(self):
+        """Test the default page size is read from API_PAGE_SIZE."""
+        create_recipe(user=self.user)
+        create_recipe(user=self.user)
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertIsNotNone(res.data['next'])
+
+
+class BulkRecipeApiTests(TestCase):
+    """Test the bulk recipe API."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create_update_delete(self):
+        """Test a batch creates, updates and deletes recipes."""
+        to_update = create_recipe(user=self.user, title='Old title')
+        to_update.tags.add(Tag.objects.create(user=self.user, name='Lunch'))
+        to_delete = create_recipe(user=self.user)
+        payload = {
+            'create': [
+                {
+                    'title': 'Thai Curry',
+                    'time_minutes': 30,
+                    'price': '10.50',
+                    'tags': [{'name': 'Thai'}, {'name': 'Dinner'}],
+                    'ingredients': [{'name': 'Rice'}],
+                },
+                {
+                    'title': 'Green Curry',
+                    'time_minutes': 25,
+                    'price': '9.00',
+                    'tags': [{'name': 'Thai'}],
+                },
+            ],
+            'update': [
+                {
+                    'id': to_update.id,
+                    'title': 'New title',
+                    'tags': [{'name': 'Dinner'}],
+                },
+            ],
+            'delete': [to_delete.id],
+        }
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['create']), 2)
+        self.assertEqual(res.data['update'][0]['title'], 'New title')
+        self.assertEqual(res.data['delete'], [to_delete.id])
+
+        curry = Recipe.objects.get(id=res.data['create'][0]['id'])
+        self.assertEqual(curry.user, self.user)
+        self.assertEqual(
+            sorted(tag.name for tag in curry.tags.all()),
+            ['Dinner', 'Thai'],
+        )
+        self.assertEqual(curry.ingredients.get().name, 'Rice')
+        self.assertEqual(
+            Tag.objects.filter(user=self.user, name='Thai').count(), 1,
+        )
+
+        to_update.refresh_from_db()
+        self.assertEqual(to_update.title, 'New title')
+        self.assertEqual(to_update.link, 'http://example.com/recipe.pdf')
+        self.assertEqual(
+            [tag.name for tag in to_update.tags.all()], ['Dinner'],
+        )
+        self.assertFalse(Recipe.objects.filter(id=to_delete.id).exists())
+
+    def test_bulk_reports_item_errors(self):
+        """Test invalid items are reported and nothing is written."""
+        other_user = create_user(
+            email='other@example.com',
+            password='password123',
+        )
+        other_recipe = create_recipe(user=other_user)
+        recipe = create_recipe(user=self.user)
+        payload = {
+            'create': [
+                {'title': 'Valid', 'time_minutes': 5, 'price': '1.00'},
+                {'title': 'Missing time', 'price': '1.00'},
+            ],
+            'update': [{'id': other_recipe.id, 'title': 'Stolen'}],
+            'delete': [recipe.id],
+        }
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data['create'][0], {})
+        self.assertIn('time_minutes', res.data['create'][1])
+        self.assertIn('id', res.data['update'][0])
+        self.assertTrue(Recipe.objects.filter(id=recipe.id).exists())
+        self.assertFalse(Recipe.objects.filter(title='Valid').exists())
+        other_recipe.refresh_from_db()
+        self.assertNotEqual(other_recipe.title, 'Stolen')
+
+    def test_bulk_create_requires_price(self):
+        """Test a created item without a price is a per-item error."""
+        recipe = create_recipe(user=self.user)
+        payload = {
+            'create': [
+                {'title': 'Valid', 'time_minutes': 5, 'price': '1.00'},
+                {'title': 'Soup', 'time_minutes': 5},
+            ],
+            'update': [{'id': recipe.id, 'title': 'Renamed'}],
+        }
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data['create'][0], {})
+        self.assertIn('price', res.data['create'][1])
+        self.assertNotIn('update', res.data)
+        self.assertFalse(Recipe.objects.filter(title='Valid').exists())
+
+    def test_bulk_update_and_delete_same_recipe_error(self):
+        """Test a recipe cannot be updated and deleted in one batch."""
+        recipe = create_recipe(user=self.user)
+        payload = {
+            'update': [{'id': recipe.id, 'title': 'New title'}],
+            'delete': [recipe.id],
+        }
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(Recipe.objects.filter(id=recipe.id).exists())
+
+    def test_bulk_batch_size_limited(self):
+        """Test batches over the item limit are rejected."""
+        payload = {
+            'create': [
+                {'title': f'Recipe {i}', 'time_minutes': 5, 'price': '1.00'}
+                for i in range(3)
+            ],
+        }
+
+        with patch(
+            'recipe.serializers.RecipeBulkSerializer.max_items', 2
+        ):
+            res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Recipe.objects.exists())
+
+
+@override_settings(CACHE_SHARED=True)
+class ConditionalRecipeApiTests(TestCase):
+    """Test conditional requests on the recipe API."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(self.user)
+        self.recipe = create_recipe(user=self.user)
+
+    def test_list_not_modified(self):
+        """Test a matching If-None-Match on the list returns 304."""
+        res = self.client.get(RECIPES_URL)
+        etag = res['ETag']
+
+        with self.assertNumQueries(0):
+            res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+
+    def test_detail_not_modified(self):
+        """Test a matching If-None-Match on a recipe returns 304."""
+        url = detail_url(self.recipe.id)
+        etag = self.client.get(url)['ETag']
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_changes_after_write(self):
+        """Test the ETag no longer matches once the data changes."""
+        url = detail_url(self.recipe.id)
+        etag = self.client.get(url)['ETag']
+
+        self.client.patch(url, {'title': 'New title'})
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['title'], 'New title')
+        self.assertNotEqual(res['ETag'], etag)
+
+    def test_etag_varies_by_query(self):
+        """Test different query parameters get different ETags."""
+        res1 = self.client.get(RECIPES_URL)
+        res2 = self.client.get(RECIPES_URL, {'page_size': 1})
+
+        self.assertNotEqual(res1['ETag'], res2['ETag'])
+
+    def test_update_if_match(self):
+        """Test an update with a current If-Match succeeds."""
+        url = detail_url(self.recipe.id)
+        etag = self.client.get(url)['ETag']
+
+        res = self.client.patch(
+            url,
+            {'title': 'New title'},
+            HTTP_IF_MATCH=etag,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertEqual(self.client.get(url)['ETag'], res['ETag'])
+
+    def test_update_stale_if_match(self):
+        """Test an update with a stale If-Match is rejected."""
+        url = detail_url(self.recipe.id)
+        etag = self.client.get(url)['ETag']
+        self.client.patch(url, {'title': 'First update'})
+
+        res = self.client.put(
+            url,
+            {'title': 'Second update', 'time_minutes': 5, 'price': '1.00'},
+            HTTP_IF_MATCH=etag,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.title, 'First update')
+
+    def test_no_etags_without_shared_cache(self):
+        """Test ETags are not used when the cache is process-local."""
+        url = detail_url(self.recipe.id)
+        etag = self.client.get(url)['ETag']
+
+        with override_settings(CACHE_SHARED=False):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            stale = self.client.patch(
+                url,
+                {'title': 'New title'},
+                HTTP_IF_MATCH=etag,
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn('ETag', res)
+        self.assertEqual(
+            stale.status_code,
+            status.HTTP_412_PRECONDITION_FAILED,
+        )
+
+
+class SparseFieldsetTests(TestCase):
+    """Test selecting recipe fields with ?fields= and ?omit=."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(self.user)
+        self.recipe = create_recipe(user=self.user)
+        self.recipe.tags.add(Tag.objects.create(user=self.user, name='Thai'))
+
+    def test_list_fields(self):
+        """Test ?fields= limits list output and skips the prefetches."""
+        with self.assertNumQueries(1):
+            res = self.client.get(RECIPES_URL, {'fields': 'id,title'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data['results'],
+            [{'id': self.recipe.id, 'title': self.recipe.title}],
+        )
+
+    def test_list_fields_with_relation(self):
+        """Test a selected relation is still returned."""
+        with self.assertNumQueries(2):
+            res = self.client.get(RECIPES_URL, {'fields': 'title,tags'})
+
+        self.assertEqual(
+            res.data['results'][0],
+            {
+                'title': self.recipe.title,
+                'tags': [{'id': self.recipe.tags.get().id, 'name': 'Thai'}],
+            },
+        )
+
+    def test_detail_omit(self):
+        """Test ?omit= removes fields from the detail output."""
+        url = detail_url(self.recipe.id)
+        params = {'omit': 'tags,ingredients,description,image'}
+
+        with self.assertNumQueries(1):
+            res = self.client.get(url, params)
+
+        serializer = RecipeDetailSerializer(self.recipe)
+        expected = {
+            key: value for key, value in serializer.data.items()
+            if key not in params['omit'].split(',')
+        }
+        self.assertEqual(res.data, expected)
+
+    def test_fields_and_omit(self):
+        """Test ?fields= and ?omit= can be combined."""
+        res = self.client.get(
+            detail_url(self.recipe.id),
+            {'fields': 'id,title,price', 'omit': 'price'},
+        )
+
+        self.assertEqual(set(res.data), {'id', 'title'})
+
+    def test_unknown_fields_rejected(self):
+        """Test unknown field names are rejected with the allowed ones."""
+        res = self.client.get(RECIPES_URL, {'fields': 'id,bogus'})
+        omit = self.client.get(
+            detail_url(self.recipe.id),
+            {'omit': 'bogus'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('bogus', res.data['fields'])
+        self.assertIn('title', res.data['fields'])
+        self.assertEqual(omit.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('bogus', omit.data['omit'])
+
+    def test_fields_ignored_on_update(self):
+        """Test writes always return the full representation."""
+        url = detail_url(self.recipe.id) + '?fields=id'
+
+        res = self.client.patch(url, {'title': 'New title'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['title'], 'New title')
+        self.assertIn('tags', res.data)
+
+
+class RecipeSearchTests(TestCase):
+    """Test full text search of recipes."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_search_ranks_title_above_description(self):
+        """Test title matches rank above description matches."""
+        in_description = create_recipe(
+            user=self.user,
+            title='Weeknight dinner',
+            description='A quick curry with rice',
+        )
+        in_title = create_recipe(
+            user=self.user,
+            title='Green curry',
+            description='Spicy and fragrant',
+        )
+        create_recipe(user=self.user, title='Lamb roast', description='')
+
+        res = self.client.get(RECIPES_URL, {'search': 'curries'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [recipe['id'] for recipe in res.data['results']],
+            [in_title.id, in_description.id],
+        )
+
+    def test_search_follows_updates(self):
+        """Test the search index is kept up to date on save."""
+        recipe = create_recipe(user=self.user, title='Lamb roast')
+
+        recipe.title = 'Beef stew'
+        recipe.save()
+
+        res = self.client.get(RECIPES_URL, {'search': 'stew'})
+        self.assertEqual(res.data['results'][0]['id'], recipe.id)
+        res = self.client.get(RECIPES_URL, {'search': 'lamb'})
+        self.assertEqual(res.data['results'], [])
+
+    def test_search_combined_with_filters(self):
+        """Test search can be combined with the tag filter."""
+        r1 = create_recipe(user=self.user, title='Thai curry')
+        create_recipe(user=self.user, title='Indian curry')
+        tag = Tag.objects.create(user=self.user, name='Thai')
+        r1.tags.add(tag)
+
+        res = self.client.get(
+            RECIPES_URL,
+            {'search': 'curry', 'tags': f'{tag.id}'},
+        )
+
+        self.assertEqual(
+            [recipe['id'] for recipe in res.data['results']],
+            [r1.id],
+        )
+
+    def test_search_limited_to_user(self):
+        """Test search only returns the user's recipes."""
+        other_user = create_user(
+            email='other@example.com',
+            password='password123',
+        )
+        create_recipe(user=other_user, title='Green curry')
+
+        res = self.client.get(RECIPES_URL, {'search': 'curry'})
+
+        self.assertEqual(res.data['results'], [])
+
+    def test_paginate_search_results(self):
+        """Test cursors page through ranked results once each."""
+        recipes = [
+            create_recipe(
+                user=self.user,
+                title='Curry' if i % 2 else 'Dinner',
+                description='curry' if i % 3 else '',
+            )
+            for i in range(6)
+        ]
+        matching = {
+            recipe.id for recipe in recipes
+            if 'curry' in (recipe.title + recipe.description).lower()
+        }
+
+        ids = []
+        url = RECIPES_URL + '?search=curry&page_size=2'
+        while url:
+            res = self.client.get(url)
+            ids += [recipe['id'] for recipe in res.data['results']]
+            url = res.data['next']
+
+        self.assertEqual(len(ids), len(matching))
+        self.assertEqual(set(ids), matching)
 
 
 class ImagUploadTests(TestCase):
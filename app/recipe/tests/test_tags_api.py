@@ -18,6 +18,7 @@ from recipe.serializers import TagSerializer
 
 
 TAGS_URL = reverse('recipe:tag-list')
+AUTOCOMPLETE_URL = reverse('recipe:tag-autocomplete')
 
 
 def detail_url(tag_id):
@@ -58,7 +59,7 @@ class PrivateTagsAPITest(TestCase):
         tags = Tag.objects.all().order_by('-name')
         serializer = TagSerializer(tags, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_tags_limited_by_user(self):
         user2 = create_user(email='example2@example.com')
@@ -69,9 +70,9 @@ class PrivateTagsAPITest(TestCase):
         res = self.client.get(TAGS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], expected.name)
-        self.assertEqual(res.data[0]['id'], expected.id)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], expected.name)
+        self.assertEqual(res.data['results'][0]['id'], expected.id)
 
     def test_update_tag(self):
         """Test update tag"""
@@ -111,8 +112,8 @@ class PrivateTagsAPITest(TestCase):
 
         s1 = TagSerializer(tag)
         s2 = TagSerializer(tag2)
-        self.assertIn(s1.data, res.data)
-        self.assertNotIn(s2.data, res.data)
+        self.assertIn(s1.data, res.data['results'])
+        self.assertNotIn(s2.data, res.data['results'])
 
     def test_filtered_tags_unique(self):
         recipe1 = Recipe.objects.create(
@@ -135,4 +136,135 @@ class PrivateTagsAPITest(TestCase):
 
         res = self.client.get(TAGS_URL, {'assigned_only': 1})
 
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_tags_with_counts(self):
+        """Test listing tags with the number of recipes using them."""
+        tag = Tag.objects.create(user=self.user, name='Lunch')
+        unused = Tag.objects.create(user=self.user, name='Dinner')
+        for title in ['Thai Curry', 'Poached Eggs']:
+            recipe = Recipe.objects.create(
+                user=self.user,
+                title=title,
+                time_minutes=22,
+                price=Decimal('5.25'),
+            )
+            recipe.tags.add(tag)
+
+        res = self.client.get(TAGS_URL, {'with_counts': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        counts = {
+            item['id']: item['recipe_count'] for item in res.data['results']
+        }
+        self.assertEqual(counts, {tag.id: 2, unused.id: 0})
+
+        res = self.client.get(TAGS_URL, {'with_counts': 1, 'assigned_only': 1})
+
+        self.assertEqual(res.data['results'], [
+            {'id': tag.id, 'name': 'Lunch', 'recipe_count': 2},
+        ])
+
+    def test_assigned_only_flag_values(self):
+        """Test assigned_only accepts true and rejects unknown values."""
+        tag = Tag.objects.create(user=self.user, name='Lunch')
+        Tag.objects.create(user=self.user, name='Dinner')
+        recipe = Recipe.objects.create(
+            user=self.user,
+            title='Thai Curry',
+            time_minutes=22,
+            price=Decimal('5.25'),
+        )
+        recipe.tags.add(tag)
+
+        res = self.client.get(TAGS_URL, {'assigned_only': 'true'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['id'] for item in res.data['results']], [tag.id],
+        )
+
+        res = self.client.get(TAGS_URL, {'assigned_only': 'bogus'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('assigned_only', res.data)
+
+    def test_with_counts_flag_values(self):
+        """Test with_counts accepts common true values and rejects others."""
+        Tag.objects.create(user=self.user, name='Lunch')
+
+        res = self.client.get(TAGS_URL, {'with_counts': 'yes'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('recipe_count', res.data['results'][0])
+
+        res = self.client.get(TAGS_URL, {'with_counts': 'false'})
+
+        self.assertNotIn('recipe_count', res.data['results'][0])
+
+        res = self.client.get(TAGS_URL, {'with_counts': 'bogus'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('with_counts', res.data)
+
+    def test_paginate_tags_with_duplicate_names(self):
+        """Test cursors page through tags sharing the same name."""
+        tags = [
+            Tag.objects.create(user=self.user, name=name)
+            for name in ['Lunch', 'Lunch', 'Lunch', 'Dinner', 'Brunch']
+        ]
+
+        ids = []
+        url = TAGS_URL + '?page_size=2'
+        while url:
+            res = self.client.get(url)
+            ids += [tag['id'] for tag in res.data['results']]
+            url = res.data['next']
+
+        self.assertEqual(sorted(ids), sorted(tag.id for tag in tags))
+        self.assertEqual(ids[:3], [tag.id for tag in reversed(tags[:3])])
+
+
+class TagAutocompleteApiTests(TestCase):
+    """Test autocompleting tag names."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        names = ['Dinner', 'dessert', 'Desserts', 'Vegetarian', 'Breakfast']
+        for name in names:
+            Tag.objects.create(user=self.user, name=name)
+
+    def test_autocomplete_prefix(self):
+        """Test names starting with the query are suggested, in order."""
+        other_user = create_user(email='other@example.com')
+        Tag.objects.create(user=other_user, name='dessert')
+
+        res = self.client.get(AUTOCOMPLETE_URL, {'q': 'de'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['name'] for item in res.data], ['dessert', 'Desserts'],
+        )
+
+    def test_autocomplete_similar(self):
+        """Test misspelt queries suggest similar names."""
+        res = self.client.get(AUTOCOMPLETE_URL, {'q': 'vegitarian'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]['name'], 'Vegetarian')
+
+    def test_autocomplete_limit(self):
+        """Test the number of suggestions is capped by ?limit=."""
+        res = self.client.get(AUTOCOMPLETE_URL, {'q': 'de', 'limit': 1})
+
+        self.assertEqual(
+            [item['name'] for item in res.data], ['dessert'],
+        )
+
+    def test_autocomplete_requires_query(self):
+        """Test a query is required."""
+        res = self.client.get(AUTOCOMPLETE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,268 @@
+"""
+Tests for streamed, content-addressed image uploads.
+"""
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.db import (connection, transaction)
+from django.test import (
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+from PIL import Image
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe
+from core.storage import ContentAddressedStorage
+from recipe.images import release_image
+
+
+def image_upload_url(recipe_id):
+    """Create and return an image upload URL."""
+    return reverse('recipe:recipe-upload-image', args=[recipe_id])
+
+
+def detail_url(recipe_id):
+    """Create and return a recipe detail URL."""
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def image_bytes(color='red', size=(10, 10)):
+    """Return the bytes of a JPEG image."""
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+class ContentAddressedStorageTests(TestCase):
+    """Test storing files by content."""
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.storage = ContentAddressedStorage(location=self.root.name)
+
+    def tearDown(self):
+        self.root.cleanup()
+
+    def test_named_by_digest(self):
+        """Test files are named by their SHA256 digest."""
+        content = b'recipe photo'
+
+        name = self.storage.save('uploads/photo.JPG', ContentFile(content))
+
+        digest = hashlib.sha256(content).hexdigest()
+        self.assertEqual(name, f'uploads/{digest}.jpg')
+        with self.storage.open(name) as stored:
+            self.assertEqual(stored.read(), content)
+
+    def test_duplicate_content_shares_file(self):
+        """Test saving the same content twice keeps one file."""
+        first = self.storage.save('a/one.jpg', ContentFile(b'same'))
+        second = self.storage.save('a/two.jpg', ContentFile(b'same'))
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(os.listdir(os.path.join(self.root.name, 'a'))), 1)
+
+    def test_precomputed_digest_used(self):
+        """Test a sha256 attribute on the content is used as the name."""
+        content = ContentFile(b'data')
+        content.sha256 = 'a' * 64
+
+        name = self.storage.save('b/photo.png', content)
+
+        self.assertEqual(name, f'b/{"a" * 64}.png')
+
+
+class ImageUploadStorageTests(TestCase):
+    """Test image uploads through the API."""
+
+    def setUp(self):
+        patcher = patch('recipe.views.schedule_variants')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.client.force_authenticate(self.user)
+        self.recipes = [
+            Recipe.objects.create(
+                user=self.user,
+                title=f'Recipe {i}',
+                time_minutes=10,
+                price=Decimal('5.00'),
+            )
+            for i in range(2)
+        ]
+
+    def tearDown(self):
+        for recipe in self.recipes:
+            recipe.refresh_from_db()
+            recipe.image.delete()
+
+    def upload(self, recipe, content, name='photo.jpg'):
+        """Upload image content to a recipe and return the response."""
+        image_file = ContentFile(content, name=name)
+        return self.client.post(
+            image_upload_url(recipe.id),
+            {'image': image_file},
+            format='multipart',
+        )
+
+    def test_upload_named_by_streamed_digest(self):
+        """Test the stored image is named by the upload's digest."""
+        content = image_bytes()
+
+        res = self.upload(self.recipes[0], content)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.recipes[0].refresh_from_db()
+        digest = hashlib.sha256(content).hexdigest()
+        self.assertEqual(
+            self.recipes[0].image.name,
+            f'uploads/recipe/{digest}.jpg',
+        )
+
+    def test_duplicate_uploads_share_file(self):
+        """Test the same photo on two recipes is stored once."""
+        content = image_bytes()
+
+        self.upload(self.recipes[0], content)
+        self.upload(self.recipes[1], content)
+
+        first, second = Recipe.objects.order_by('id').values_list(
+            'image',
+            flat=True,
+        )
+        self.assertEqual(first, second)
+
+    @override_settings(RECIPE_IMAGE_MAX_SIZE=100)
+    def test_oversized_upload_rejected_while_streaming(self):
+        """Test an upload over the cap is refused while it streams."""
+        res = self.upload(self.recipes[0], image_bytes(size=(200, 200)))
+
+        self.assertEqual(
+            res.status_code,
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+        self.recipes[0].refresh_from_db()
+        self.assertFalse(self.recipes[0].image)
+
+    @override_settings(
+        RECIPE_IMAGE_MAX_SIZE=100,
+        DATA_UPLOAD_MAX_MEMORY_SIZE=100,
+    )
+    def test_oversized_request_rejected_before_reading(self):
+        """Test a request longer than the cap is refused up front."""
+        res = self.upload(self.recipes[0], image_bytes(size=(200, 200)))
+
+        self.assertEqual(
+            res.status_code,
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+
+    @override_settings(RECIPE_IMAGE_MAX_SIZE=100)
+    def test_other_uploads_not_capped(self):
+        """Test uploads outside the image API use Django's handlers."""
+        request = RequestFactory().post('/', {
+            'file': ContentFile(b'x' * 200, name='notes.txt'),
+        })
+
+        self.assertEqual(request.FILES['file'].size, 200)
+
+    def test_replaced_image_released(self):
+        """Test replacing an unshared image deletes the old file."""
+        self.upload(self.recipes[0], image_bytes('red'))
+        self.recipes[0].refresh_from_db()
+        old_path = self.recipes[0].image.path
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload(self.recipes[0], image_bytes('blue'))
+
+        self.assertFalse(os.path.exists(old_path))
+
+    def test_shared_image_kept_until_unused(self):
+        """Test a shared image is only deleted with its last recipe."""
+        content = image_bytes()
+        self.upload(self.recipes[0], content)
+        self.upload(self.recipes[1], content)
+        self.recipes[0].refresh_from_db()
+        path = self.recipes[0].image.path
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(detail_url(self.recipes[0].id))
+        self.assertTrue(os.path.exists(path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(detail_url(self.recipes[1].id))
+        self.assertFalse(os.path.exists(path))
+        self.recipes = []
+
+    def test_release_deletes_variants(self):
+        """Test releasing an unused image deletes its variants."""
+        storage = Recipe._meta.get_field('image').storage
+        name = storage.save('uploads/recipe/x.jpg', ContentFile(b'image'))
+        variant = storage.save('uploads/recipe/x.jpg', ContentFile(b'thumb'))
+
+        release_image(name, {'thumbnail': variant})
+
+        self.assertFalse(storage.exists(name))
+        self.assertFalse(storage.exists(variant))
+
+
+class ConcurrentReleaseTests(TransactionTestCase):
+    """Test releasing an image while the same content is uploaded."""
+
+    def setUp(self):
+        self.recipe = Recipe.objects.create(
+            user=get_user_model().objects.create_user(
+                'user@example.com',
+                'testpass123',
+            ),
+            title='Recipe',
+            time_minutes=10,
+            price=Decimal('5.00'),
+        )
+        self.storage = Recipe._meta.get_field('image').storage
+        self.name = self.storage.save(
+            'uploads/recipe/old.jpg',
+            ContentFile(b'shared image'),
+        )
+        self.addCleanup(self.storage.delete, self.name)
+
+    def test_release_waits_for_reuse_to_commit(self):
+        """Test a file reused by an uncommitted save is not deleted."""
+        saved = threading.Event()
+
+        def reuse():
+            with transaction.atomic():
+                name = self.storage.save(
+                    'uploads/recipe/new.jpg',
+                    ContentFile(b'shared image'),
+                )
+                saved.set()
+                time.sleep(0.2)
+                Recipe.objects.filter(id=self.recipe.id).update(image=name)
+            connection.close()
+
+        thread = threading.Thread(target=reuse)
+        thread.start()
+        saved.wait()
+        release_image(self.name, {})
+        thread.join()
+
+        self.assertTrue(self.storage.exists(self.name))
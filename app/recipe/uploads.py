@@ -0,0 +1,63 @@
+"""
+Streaming upload handling for recipe images and imports.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class UploadTooLarge(APIException):
+    """Raised when an upload exceeds its handler's size cap."""
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = _('Uploaded file is too large.')
+    default_code = 'upload_too_large'
+
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+    """Stream uploads to disk, hashing them and enforcing a size cap.
+
+    Requests whose declared length cannot fit under the cap are refused
+    before the body is read. Otherwise the upload is refused as soon as a
+    chunk takes it over the cap. Completed files carry their SHA256 hex
+    digest as a sha256 attribute.
+    """
+
+    def get_max_size(self):
+        """Return the largest file accepted, in bytes."""
+        return settings.RECIPE_IMAGE_MAX_SIZE
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        limit = self.get_max_size() + settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        if content_length > limit:
+            raise UploadTooLarge()
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.get_max_size():
+            self.file.close()
+            raise UploadTooLarge()
+
+        self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.sha256 = self.sha256.hexdigest()
+        return file
+
+
+class ImportUploadHandler(HashingUploadHandler):
+    """Upload handler for recipe import files."""
+
+    def get_max_size(self):
+        return settings.RECIPE_IMPORT_MAX_SIZE
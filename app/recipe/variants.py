@@ -0,0 +1,45 @@
+"""
+Resized and WebP variants of recipe images.
+
+Rendered by the render_image_variants job in recipe.images, which
+records the result on the recipe. This module only reads and writes
+files.
+"""
+import os
+
+from PIL import (Image, ImageOps, features)
+
+
+VARIANT_SIZES = {
+    'thumbnail': 320,
+    'medium': 1024,
+}
+
+
+def render_variants(root, name):
+    """Write the variants of an image and return their names by variant.
+
+    Every size is saved as JPEG and, when Pillow supports it, as WebP.
+    Images are never enlarged. Images are stored by content, so variants
+    already rendered for the same image are reused.
+    """
+    stem = os.path.splitext(name)[0]
+    formats = [('', 'JPEG', '.jpg')]
+    if features.check('webp'):
+        formats.append(('_webp', 'WEBP', '.webp'))
+
+    with Image.open(os.path.join(root, name)) as original:
+        image = ImageOps.exif_transpose(original).convert('RGB')
+
+    variants = {}
+    for size_name, size in VARIANT_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail((size, size))
+        for suffix, image_format, extension in formats:
+            variant_name = f'{stem}-{size_name}{extension}'
+            path = os.path.join(root, variant_name)
+            if not os.path.exists(path):
+                resized.save(path, image_format, quality=85)
+            variants[f'{size_name}{suffix}'] = variant_name
+
+    return variants
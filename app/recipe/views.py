@@ -7,68 +7,335 @@ from drf_spectacular.utils import (
     OpenApiParameter,
     OpenApiTypes,
 )
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramSimilarity,
+)
+from django.db import transaction
+from django.db.models import (
+    Count,
+    Exists,
+    F,
+    FloatField,
+    OuterRef,
+    Subquery,
+)
+from django.db.models.functions import (Cast, Coalesce, Collate, Lower)
+from django.http import StreamingHttpResponse
+from django.utils.http import parse_etags
 from rest_framework import (viewsets, mixins, status)
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import (IsAuthenticated, IsAdminUser)
+from rest_framework.views import APIView
 
 
-from core.models import (Recipe, Tag, Ingredient)
+from core.db.routers import read_pinned
+from core.jobs import enqueue
+from core.models import (Recipe, RecipeImport, Tag, Ingredient)
 from recipe import serializers
+from recipe.export import (NDJSONRenderer, export_lines)
+from recipe.fastpath import ValuesSerializer
+from recipe.images import (release_image, schedule_variants)
+from recipe.imports import run_import
+from recipe.cache import (
+    caching_enabled,
+    get_response,
+    get_stats,
+    response_cache_key,
+    response_etag,
+    set_response,
+)
+from recipe.pagination import (
+    RecipeCursorPagination,
+    RecipeAttributeCursorPagination,
+)
+from recipe.uploads import (HashingUploadHandler, ImportUploadHandler)
+from user.authentication import CachedTokenAuthentication
+
+
+def limit_param(request, default, maximum):
+    """Return the ?limit= parameter, clamped between 1 and maximum."""
+    try:
+        limit = int(request.query_params.get('limit', default))
+    except ValueError:
+        raise ValidationError({'limit': 'Must be an integer.'})
+
+    return max(1, min(limit, maximum))
+
+
+def flag_param(request, name):
+    """Return whether a boolean query parameter such as ?name=1 is set."""
+    value = request.query_params.get(name, '0').lower()
+    if value in ('1', 'true', 'yes'):
+        return True
+    if value in ('0', 'false', 'no', ''):
+        return False
+
+    raise ValidationError({name: 'Must be one of: 0, 1.'})
+
+
+class FastListMixin:
+    """List from .values() rows instead of model and serializer instances."""
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = ValuesSerializer(self.get_serializer())
+
+        if self.paginator is None:
+            rows = serializer.values(queryset)
+            return Response(serializer.to_representation(list(rows)))
+
+        ordering = self.paginator.get_ordering(request, queryset, self)
+        rows = serializer.values(
+            queryset,
+            *[name.lstrip('-') for name in ordering],
+        )
+        page = self.paginate_queryset(rows)
+        return self.get_paginated_response(serializer.to_representation(page))
+
+
+def cached_response(request, handler, *args, **kwargs):
+    """Return a response from the per-user response cache, or fill it.
+
+    Users whose data changed recently fill it from the primary, so a
+    lagging replica is never cached under their current data version.
+    """
+    if not caching_enabled():
+        return handler(request, *args, **kwargs)
+
+    key = response_cache_key(request)
+    data = get_response(key)
+    if data is not None:
+        return Response(data, headers={'X-Cache': 'HIT'})
+
+    read_pinned(request.user.id)
+    response = handler(request, *args, **kwargs)
+    set_response(key, response.data)
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+class CachedListMixin:
+    """Serve list responses from the per-user response cache."""
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(request, super().list, *args, **kwargs)
+
+
+SPARSE_FIELDS_PARAMETERS = [
+    OpenApiParameter(
+        'fields',
+        OpenApiTypes.STR,
+        description='Comma separated list of fields to return',
+    ),
+    OpenApiParameter(
+        'omit',
+        OpenApiTypes.STR,
+        description='Comma separated list of fields to leave out',
+    ),
+]
+
+
+RECIPE_FILTER_PARAMETERS = [
+    OpenApiParameter(
+        'tags',
+        OpenApiTypes.STR,
+        description='Comma separated list of tag IDs to filter',
+    ),
+    OpenApiParameter(
+        'ingredients',
+        OpenApiTypes.STR,
+        description='Comma separated list of ingredient IDs to filter',
+    ),
+    OpenApiParameter(
+        'search',
+        OpenApiTypes.STR,
+        description='Full text search over title and description, '
+                    'results are ordered by relevance',
+    ),
+    OpenApiParameter(
+        'match',
+        OpenApiTypes.STR, enum=['any', 'all'],
+        description='Match recipes with any (default) or all of the '
+                    'given tags and ingredients',
+    ),
+]
+
+
+class ConditionalRequestMixin:
+    """Support conditional requests with ETags from the data version.
+
+    ETags are only sent while responses may be cached, as the data
+    version is otherwise not shared between processes. Without them an
+    If-Match other than * never matches. Responses of users whose data
+    changed recently are read from the primary, so an ETag never labels
+    a lagging replica's data.
+    """
+
+    def _resource_etag(self, request):
+        """Return the ETag of the resource without query parameters."""
+        if not caching_enabled():
+            return None
+
+        return response_etag(
+            request,
+            request.build_absolute_uri(request.path),
+        )
+
+    def _conditional_get(self, handler, request, *args, **kwargs):
+        """Return 304 when If-None-Match matches the current ETag."""
+        if not caching_enabled():
+            return handler(request, *args, **kwargs)
+
+        etag = response_etag(request)
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+        if etag in parse_etags(if_none_match):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED,
+                headers={'ETag': etag},
+            )
+
+        read_pinned(request.user.id)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional_get(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional_get(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def update(self, request, *args, **kwargs):
+        """Update when If-Match, if sent, matches the current ETag."""
+        if_match = request.META.get('HTTP_IF_MATCH')
+        if if_match is not None:
+            etags = parse_etags(if_match)
+            if '*' not in etags and self._resource_etag(request) not in etags:
+                return Response(status=status.HTTP_412_PRECONDITION_FAILED)
+
+        response = super().update(request, *args, **kwargs)
+        etag = self._resource_etag(request)
+        if response.status_code == status.HTTP_200_OK and etag:
+            response['ETag'] = etag
+        return response
 
 
 @extend_schema_view(
     list=extend_schema(
-        parameters=[
-            OpenApiParameter(
-                'tags',
-                OpenApiTypes.STR,
-                description='Comma separated list of tag IDs to filter',
-            ),
-            OpenApiParameter(
-                'ingredients',
-                OpenApiTypes.STR,
-                description='Comma separated list of ingredient IDs to filter',
-            )
-        ]
-    )
+        parameters=[*RECIPE_FILTER_PARAMETERS, *SPARSE_FIELDS_PARAMETERS]
+    ),
+    retrieve=extend_schema(parameters=SPARSE_FIELDS_PARAMETERS),
 )
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(
+    ConditionalRequestMixin,
+    CachedListMixin,
+    FastListMixin,
+    viewsets.ModelViewSet,
+):
     """View to manage recipe APIs."""
     serializer_class = serializers.RecipeDetailSerializer
     queryset = Recipe.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = RecipeCursorPagination
+    nested_fields = ['tags', 'ingredients']
+    facet_limit = 100
+    max_facet_limit = 500
+
+    def initialize_request(self, request, *args, **kwargs):
+        """Stream image uploads to disk, hashing them and capping size."""
+        if self.action_map.get(request.method.lower()) == 'upload_image':
+            request.upload_handlers = [HashingUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
 
     def _params_to_ints(self, qs):
         """Convert a list of strings to integers"""
         return [int(str_id) for str_id in qs.split(',')]
 
+    def _filter_linked(self, queryset, through, field, ids, match):
+        """Filter recipes linked to the given IDs using semi-joins."""
+        links = through.objects.filter(recipe_id=OuterRef('pk'))
+
+        if match == 'all':
+            for link_id in set(ids):
+                queryset = queryset.filter(
+                    Exists(links.filter(**{field: link_id}))
+                )
+            return queryset
+
+        return queryset.filter(Exists(links.filter(**{f'{field}__in': ids})))
+
     def get_queryset(self):
         """Retrieve recipes for authenticated user."""
         tags = self.request.query_params.get('tags')
         ingredients = self.request.query_params.get('ingredients')
+        search = self.request.query_params.get('search')
+        match = self.request.query_params.get('match', 'any')
         queryset = self.queryset
 
+        if match not in ('any', 'all'):
+            raise ValidationError({'match': 'Must be one of: any, all.'})
+
+        if self.action in ('list', 'retrieve'):
+            fields = serializers.sparse_fields(
+                self.request,
+                self.get_serializer_class().Meta.fields,
+            )
+            relations = [
+                name for name in self.nested_fields if name in fields
+            ]
+            queryset = queryset\
+                .only(*[name for name in fields if name not in relations])\
+                .prefetch_related(*relations)
+        else:
+            queryset = queryset.defer('search_vector')
+            if self.action != 'upload_image':
+                queryset = queryset.prefetch_related(*self.nested_fields)
+
         if tags:
             tags_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tags_ids)
+            queryset = self._filter_linked(
+                queryset, Recipe.tags.through, 'tag_id', tags_ids, match,
+            )
 
         if ingredients:
             ingredients_ids = self._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredients_ids)
+            queryset = self._filter_linked(
+                queryset, Recipe.ingredients.through, 'ingredient_id',
+                ingredients_ids, match,
+            )
+
+        if search:
+            query = SearchQuery(
+                search,
+                config='english',
+                search_type='websearch',
+            )
+            queryset = queryset\
+                .filter(search_vector=query)\
+                .annotate(search_rank=Cast(
+                    SearchRank(F('search_vector'), query),
+                    FloatField(),
+                ))
 
         return queryset\
             .filter(user=self.request.user)\
-            .order_by('-id')\
-            .distinct()
+            .order_by('-id')
 
     def get_serializer_class(self):
         if self.action == 'list':
             return serializers.RecipeSerializer
         elif self.action == 'upload_image':
             return serializers.RecipeImageSerializer
+        elif self.action == 'bulk':
+            return serializers.RecipeBulkSerializer
 
         return self.serializer_class
 
@@ -81,8 +348,113 @@ class RecipeViewSet(viewsets.ModelViewSet):
     def upload_image(self, request, pk=None):
         """Upload an image to recipe."""
         recipe = self.get_object()
+        old_image = (recipe.image.name, recipe.image_variants)
         serializer = self.get_serializer(recipe, data=request.data)
 
+        if serializer.is_valid():
+            with transaction.atomic():
+                recipe = serializer.save(image_variants={})
+                schedule_variants(recipe)
+            if old_image[0] != recipe.image.name:
+                transaction.on_commit(lambda: release_image(*old_image))
+            return Response(serializer.data, status=status.HTTP_200_OK)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @extend_schema(responses=serializers.RecipeDetailSerializer)
+    @action(
+        methods=['GET'],
+        detail=False,
+        url_path='export',
+        renderer_classes=[NDJSONRenderer],
+    )
+    def export(self, request):
+        """Stream the user's recipes as newline delimited JSON."""
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(
+            export_lines(queryset, self.get_serializer()),
+            content_type=NDJSONRenderer.media_type,
+        )
+        response['Content-Disposition'] = \
+            'attachment; filename="recipes.ndjson"'
+        return response
+
+    def _facet_counts(self, links, model, limit):
+        """Return the number of links to each tag or ingredient.
+
+        Links are grouped on the foreign key alone, and names are only
+        fetched for the rows returned.
+        """
+        fk_name = f'{model._meta.model_name}_id'
+        counts = list(
+            links
+            .values_list(fk_name)
+            .annotate(count=Count('*'))
+            .order_by('-count', fk_name)[:limit]
+        )
+        names = dict(
+            model.objects
+            .filter(id__in=[obj_id for obj_id, count in counts])
+            .values_list('id', 'name')
+        )
+
+        return [
+            {'id': obj_id, 'name': names[obj_id], 'count': count}
+            for obj_id, count in counts
+        ]
+
+    @extend_schema(
+        parameters=[
+            *RECIPE_FILTER_PARAMETERS,
+            OpenApiParameter(
+                'limit',
+                OpenApiTypes.INT,
+                description='Maximum number of tags and of ingredients, '
+                            'up to 500',
+            ),
+        ],
+        responses=serializers.RecipeFacetsSerializer,
+    )
+    @action(methods=['GET'], detail=False, url_path='facets')
+    def facets(self, request):
+        """Count the recipes matching the filters by tag and ingredient.
+
+        Without filters every link to the user's tags and ingredients is
+        counted, as they only link to recipes of the same user. Results
+        are cached until the user's data changes.
+        """
+        return cached_response(request, self._facets)
+
+    def _facets(self, request):
+        """Count the recipes matching the filters."""
+        limit = limit_param(request, self.facet_limit, self.max_facet_limit)
+        recipes = self.get_queryset()
+        filtered = any(
+            request.query_params.get(name)
+            for name in ('tags', 'ingredients', 'search')
+        )
+
+        data = {'count': recipes.count()}
+        for field, model in (('tags', Tag), ('ingredients', Ingredient)):
+            through = getattr(Recipe, field).through
+            if filtered:
+                links = through.objects.filter(
+                    recipe_id__in=recipes.order_by().values('id'),
+                )
+            else:
+                links = through.objects.filter(**{
+                    f'{model._meta.model_name}_id__in':
+                        model.objects.filter(user=request.user).values('id'),
+                })
+            data[field] = self._facet_counts(links, model, limit)
+
+        return Response(data)
+
+    @action(methods=['POST'], detail=False, url_path='bulk')
+    def bulk(self, request):
+        """Create, update and delete recipes in a single transaction."""
+        serializer = self.get_serializer(data=request.data)
+
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -98,41 +470,180 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 OpenApiTypes.INT, enum=[0, 1],
                 description='Filter by items assigned to recipes',
             ),
+            OpenApiParameter(
+                'with_counts',
+                OpenApiTypes.INT, enum=[0, 1],
+                description='Include the number of recipes using each item '
+                            'as recipe_count',
+            ),
         ]
     )
 )
 class BaseRecipeAttributeViewSet(
+    CachedListMixin,
+    FastListMixin,
     mixins.DestroyModelMixin,
     mixins.UpdateModelMixin,
     mixins.ListModelMixin,
     viewsets.GenericViewSet
 ):
     """Base view set for recipe attributes"""
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = RecipeAttributeCursorPagination
+    autocomplete_limit = 10
+    max_autocomplete_limit = 50
+
+    def _with_counts(self):
+        """Return whether recipe counts were asked for."""
+        return self.action == 'list' and \
+            flag_param(self.request, 'with_counts')
+
+    def _recipe_links(self):
+        """Return the through rows linking recipes to the outer item."""
+        through = getattr(Recipe, self.recipe_field).through
+        fk_name = f'{self.queryset.model._meta.model_name}_id'
+        return through.objects\
+            .filter(**{fk_name: OuterRef('pk')})\
+            .order_by()\
+            .values(fk_name)
 
     def get_queryset(self):
         """Retrieve filtered Query set for authenticated user."""
-        assigned_only = bool(
-            int(self.request.query_params.get('assigned_only', 0))
-        )
+        assigned_only = flag_param(self.request, 'assigned_only')
 
-        queryset = self.queryset
+        queryset = self.queryset.filter(user=self.request.user)
         if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
+            queryset = queryset.filter(Exists(self._recipe_links()))
+        if self._with_counts():
+            counts = self._recipe_links()\
+                .annotate(count=Count('*'))\
+                .values('count')
+            queryset = queryset.annotate(
+                recipe_count=Coalesce(Subquery(counts), 0),
+            )
+
+        return queryset.order_by('-name')
+
+    def get_serializer_class(self):
+        """Return the serializer class with counts when asked for."""
+        if self._with_counts():
+            return self.count_serializer_class
+
+        return self.serializer_class
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                'q',
+                OpenApiTypes.STR,
+                required=True,
+                description='Text typed so far',
+            ),
+            OpenApiParameter(
+                'limit',
+                OpenApiTypes.INT,
+                description='Maximum number of suggestions, up to 50',
+            ),
+        ],
+    )
+    @action(methods=['GET'], detail=False, url_path='autocomplete')
+    def autocomplete(self, request):
+        """Suggest names starting with ?q=, then names similar to it.
 
-        return queryset.filter(user=self.request.user)\
-            .order_by('-name')\
-            .distinct()
+        Prefix matches are read in order from an index on
+        (user_id, lower(name) COLLATE "C"). Queries of three or more
+        characters are topped up with trigram matches from a GIN index,
+        most similar first.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'This parameter is required.'})
+        limit = limit_param(
+            request,
+            self.autocomplete_limit,
+            self.max_autocomplete_limit,
+        )
+
+        queryset = self.get_queryset().order_by()
+        matches = list(
+            queryset
+            .annotate(name_key=Collate(Lower('name'), 'C'))
+            .filter(name_key__startswith=query.lower())
+            .order_by('name_key', 'id')[:limit]
+        )
+        if len(matches) < limit and len(query) >= 3:
+            matches += queryset\
+                .filter(name__trigram_similar=query)\
+                .exclude(id__in=[match.id for match in matches])\
+                .annotate(similarity=TrigramSimilarity('name', query))\
+                .order_by('-similarity', 'name', 'id')[:limit - len(matches)]
+
+        serializer = self.get_serializer(matches, many=True)
+        return Response(serializer.data)
 
 
 class TagViewSet(BaseRecipeAttributeViewSet):
     """Manage tags in the database"""
     serializer_class = serializers.TagSerializer
+    count_serializer_class = serializers.TagCountSerializer
     queryset = Tag.objects.all()
+    recipe_field = 'tags'
 
 
 class IngredientViewSet(BaseRecipeAttributeViewSet):
     """Manage tags in the database"""
     serializer_class = serializers.IngredientSerializer
+    count_serializer_class = serializers.IngredientCountSerializer
     queryset = Ingredient.objects.all()
+    recipe_field = 'ingredients'
+
+
+class RecipeImportViewSet(mixins.CreateModelMixin,
+                          mixins.ListModelMixin,
+                          mixins.RetrieveModelMixin,
+                          viewsets.GenericViewSet):
+    """Upload files of recipes to import and follow their progress."""
+    serializer_class = serializers.RecipeImportSerializer
+    queryset = RecipeImport.objects.all()
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    pagination_class = RecipeCursorPagination
+
+    def initialize_request(self, request, *args, **kwargs):
+        """Accept larger uploads than the image upload handler does."""
+        request.upload_handlers = [ImportUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
+    def get_queryset(self):
+        """Filter imports to the authenticated user."""
+        return self.queryset.filter(user=self.request.user).order_by('-id')
+
+    def create(self, request, *args, **kwargs):
+        """Queue an import, returning before any recipe is created."""
+        response = super().create(request, *args, **kwargs)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return response
+
+    def perform_create(self, serializer):
+        """Create the import and queue the job running it."""
+        with transaction.atomic():
+            recipe_import = serializer.save(user=self.request.user)
+            recipe_import.job = enqueue(
+                run_import,
+                user_id=recipe_import.user_id,
+                import_id=recipe_import.id,
+                delete_source=True,
+            )
+            recipe_import.save(update_fields=['job'])
+
+
+class CacheStatsView(APIView):
+    """Report the response cache hit and miss counters."""
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(responses=serializers.CacheStatsSerializer)
+    def get(self, request):
+        serializer = serializers.CacheStatsSerializer(get_stats())
+        return Response(serializer.data)
@@ -0,0 +1,65 @@
+"""
+Cached token authentication for the APIs.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+
+from core.db.routers import (primary, read_pinned)
+
+
+TOKEN_KEY = 'token:{digest}'
+
+
+def token_cache_key(key):
+    """Return the cache key for a token without storing the token itself."""
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return TOKEN_KEY.format(digest=digest)
+
+
+def forget_tokens(keys):
+    """Drop cached tokens, now and again once the transaction commits."""
+    cache_keys = [token_cache_key(key) for key in keys]
+    auth_cache = caches['auth']
+    auth_cache.delete_many(cache_keys)
+    transaction.on_commit(lambda: auth_cache.delete_many(cache_keys))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that caches the token and its user.
+
+    Entries live in the bounded 'auth' cache for TOKEN_AUTH_CACHE_TIMEOUT
+    seconds and are dropped when the token is deleted or its user saved.
+    Only tokens of active users are cached, and only with CACHE_SHARED,
+    as a process-local cache would keep accepting tokens revoked by
+    other processes.
+
+    Tokens are read from the primary, so new ones work at once, and
+    users pinned after a write read from the primary for the rest of
+    the request.
+    """
+
+    def authenticate_credentials(self, key):
+        user, token = self._get_token(key)
+        read_pinned(user.id)
+
+        return (user, token)
+
+    def _get_token(self, key):
+        """Return the user and token for a key, from the cache if enabled."""
+        if not settings.CACHE_SHARED:
+            with primary():
+                return super().authenticate_credentials(key)
+
+        auth_cache = caches['auth']
+        cache_key = token_cache_key(key)
+        token = auth_cache.get(cache_key)
+        if token is None:
+            with primary():
+                user, token = super().authenticate_credentials(key)
+            auth_cache.set(cache_key, token)
+
+        return (token.user, token)
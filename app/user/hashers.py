@@ -0,0 +1,115 @@
+"""
+Password hashing on a bounded worker pool.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from core.metrics import increment_counter
+
+
+STATS_KEY = 'user:hashing:{name}'
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class HashingUnavailable(APIException):
+    """Raised when the hashing pool has no free slot."""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _('Too many sign-in requests, try again shortly.')
+    default_code = 'hashing_unavailable'
+    wait = 1
+
+
+class HashingPool:
+    """Thread pool that rejects work once its queue is full.
+
+    PBKDF2 releases the GIL, so hashes run in parallel on the workers
+    while request threads only wait on the result.
+    """
+
+    def __init__(self, workers, queue_size):
+        self.pid = os.getpid()
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix='password-hash',
+        )
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def run(self, func, *args):
+        """Run func on the pool and return its result."""
+        if not self.slots.acquire(blocking=False):
+            increment_counter(STATS_KEY.format(name='rejected'))
+            raise HashingUnavailable()
+
+        submitted = time.monotonic()
+        try:
+            started, finished, result = self.executor.submit(
+                _timed, func, *args
+            ).result()
+        finally:
+            self.slots.release()
+
+        increment_counter(STATS_KEY.format(name='hashes'))
+        increment_counter(
+            STATS_KEY.format(name='wait_us'),
+            int((started - submitted) * 1e6),
+        )
+        increment_counter(
+            STATS_KEY.format(name='hash_us'),
+            int((finished - started) * 1e6),
+        )
+        return result
+
+
+def _timed(func, *args):
+    """Call func and return its start and finish times with the result."""
+    started = time.monotonic()
+    result = func(*args)
+    return started, time.monotonic(), result
+
+
+def get_pool():
+    """Return the hashing pool of the current process."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = HashingPool(
+                settings.PASSWORD_HASH_WORKERS,
+                settings.PASSWORD_HASH_QUEUE_SIZE,
+            )
+
+    return _pool
+
+
+def get_stats():
+    """Return hashing counters and mean hash and queue wait times."""
+    hashes, rejected, hash_us, wait_us = (
+        cache.get(STATS_KEY.format(name=name), 0)
+        for name in ('hashes', 'rejected', 'hash_us', 'wait_us')
+    )
+    return {
+        'hashes': hashes,
+        'rejected': rejected,
+        'mean_hash_ms': hash_us / hashes / 1000 if hashes else 0,
+        'mean_wait_ms': wait_us / hashes / 1000 if hashes else 0,
+    }
+
+
+class PooledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 SHA256 hasher that runs on the bounded hashing pool.
+
+    Hashes stay compatible with Django's PBKDF2PasswordHasher.
+    """
+
+    def encode(self, password, salt, iterations=None):
+        return get_pool().run(super().encode, password, salt, iterations)
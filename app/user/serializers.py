@@ -61,3 +61,11 @@ class AuthTokenSerializer(serializers.Serializer):
 
         attrs['user'] = user
         return attrs
+
+
+class HashStatsSerializer(serializers.Serializer):
+    """Serializer for password hashing statistics"""
+    hashes = serializers.IntegerField()
+    rejected = serializers.IntegerField()
+    mean_hash_ms = serializers.FloatField()
+    mean_wait_ms = serializers.FloatField()
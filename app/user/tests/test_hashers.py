@@ -0,0 +1,137 @@
+"""
+Tests for pooled password hashing.
+"""
+import threading
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import (
+    PBKDF2PasswordHasher,
+    check_password,
+    make_password,
+)
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.hashers import (
+    HashingPool,
+    HashingUnavailable,
+    PooledPBKDF2PasswordHasher,
+)
+
+
+TOKEN_URL = reverse('user:token')
+CREATE_USER_URL = reverse('user:create')
+HASH_STATS_URL = reverse('user:hash-stats')
+
+
+class HashingPoolTests(TestCase):
+    """Test the bounded hashing pool."""
+
+    def test_run_returns_result(self):
+        """Test work runs on the pool and returns its result."""
+        pool = HashingPool(1, 0)
+
+        self.assertEqual(pool.run(sum, [1, 2, 3]), 6)
+
+    def test_full_pool_rejects(self):
+        """Test work is rejected at once when every slot is taken."""
+        pool = HashingPool(1, 0)
+        started = threading.Event()
+        release = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        thread = threading.Thread(target=pool.run, args=(block,))
+        thread.start()
+        started.wait(5)
+        try:
+            with self.assertRaises(HashingUnavailable):
+                pool.run(sum, [1])
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertEqual(pool.run(sum, [1]), 1)
+
+    def test_hashes_compatible_with_pbkdf2(self):
+        """Test pooled hashes verify with the stock PBKDF2 hasher."""
+        encoded = make_password('testpass123')
+
+        self.assertTrue(encoded.startswith('pbkdf2_sha256$'))
+        self.assertTrue(PBKDF2PasswordHasher().verify('testpass123', encoded))
+        stock = PBKDF2PasswordHasher().encode('testpass123', 'salt')
+        self.assertEqual(
+            PooledPBKDF2PasswordHasher().encode('testpass123', 'salt'),
+            stock,
+        )
+        self.assertTrue(check_password('testpass123', stock))
+
+
+class HashingApiTests(TestCase):
+    """Test the APIs under hashing load."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    @patch('user.hashers.HashingPool.run', side_effect=HashingUnavailable)
+    def test_token_rejected_when_pool_full(self, patched_run):
+        """Test login returns 503 with Retry-After when hashing is full."""
+        payload = {'email': 'test@example.com', 'password': 'testpass123'}
+
+        res = self.client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res['Retry-After'], '1')
+
+    @patch('user.hashers.HashingPool.run', side_effect=HashingUnavailable)
+    def test_create_user_rejected_when_pool_full(self, patched_run):
+        """Test sign up returns 503 when hashing is full."""
+        payload = {
+            'email': 'test@example.com',
+            'password': 'testpass123',
+            'name': 'Test Name',
+        }
+
+        res = self.client.post(CREATE_USER_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(
+            get_user_model().objects.filter(email=payload['email']).exists()
+        )
+
+    def test_stats_count_hashes(self):
+        """Test staff can read hash counts and latencies."""
+        admin = get_user_model().objects.create_superuser(
+            'admin@example.com',
+            'test123',
+        )
+        self.client.force_authenticate(admin)
+        before = self.client.get(HASH_STATS_URL).data
+
+        self.client.post(TOKEN_URL, {
+            'email': 'admin@example.com',
+            'password': 'test123',
+        })
+        res = self.client.get(HASH_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['hashes'], before['hashes'] + 1)
+        self.assertGreater(res.data['mean_hash_ms'], 0)
+
+    def test_stats_require_staff(self):
+        """Test hashing statistics are limited to staff."""
+        user = get_user_model().objects.create_user(
+            'user@example.com',
+            'test123',
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.get(HASH_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
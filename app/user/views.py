@@ -2,14 +2,20 @@
 Views for the user API
 """
 
-from rest_framework import generics, authentication, permissions
+from drf_spectacular.utils import extend_schema
+from rest_framework import generics, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.settings import api_settings
 
 
+from user.authentication import CachedTokenAuthentication
+from user.hashers import get_stats
 from user.serializers import (
     UserSerializer,
     AuthTokenSerializer,
+    HashStatsSerializer,
 )
 
 
@@ -23,7 +29,7 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user"""
 
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
@@ -37,3 +43,14 @@ class CreateTokenView(ObtainAuthToken):
 
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+
+
+class HashStatsView(APIView):
+    """Report password hashing load and latency."""
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(responses=HashStatsSerializer)
+    def get(self, request):
+        serializer = HashStatsSerializer(get_stats())
+        return Response(serializer.data)